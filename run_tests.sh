@@ -14,6 +14,12 @@ print_message () {
     echo -e "${left_filler_len// /$symbol}$message${right_filler_len// /$symbol}\033[0m"
 }
 
+run_suite () {
+    # Run pytest in the project directory (first argument) with the settings
+    # module (second argument), writing all output to a file (third argument).
+    (cd "$1" && DJANGO_SETTINGS_MODULE="$2" pytest --tb=line) > "$3" 2>&1
+}
+
 
 if python -m flake8 --config=setup.cfg 1>&2;
 then
@@ -21,27 +27,32 @@ then
     echo $LF 1>&2
     if python structure_test.py
     then
-        cd ya_news
-        export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings"}"
-        if pytest --tb=line 1>&2;
+        # Suites of both projects run at the same time in separate processes;
+        # their output is printed after both finish, one project after another.
+        news_log=$(mktemp)
+        note_log=$(mktemp)
+        trap 'rm -f "$news_log" "$note_log"' EXIT
+        run_suite ya_news "${YANEWS_SETTINGS:-yanews.settings_test}" "$news_log" &
+        news_pid=$!
+        run_suite ya_note "${YANOTE_SETTINGS:-yanote.settings_test}" "$note_log" &
+        note_pid=$!
+        wait $news_pid
+        news_status=$?
+        wait $note_pid
+        note_status=$?
+        cat "$news_log" "$note_log" 1>&2
+        if [[ $news_status -ne 0 ]]
         then
-            cd ../ya_note
-            unset DJANGO_SETTINGS_MODULE
-            export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanote.settings"}"
-            if pytest --tb=line 1>&2;
-            then
-                exit 0
-            else
-                status=$?
-                print_message " При запуске упали ваши тесты для проекта YaNote. Проверьте тесты этого проекта " "=" 1
-                echo \`\`\` 1>&2
-                exit $status
-            fi
-        else
-            status=$?
             print_message " При запуске упали ваши тесты для проекта YaNews. Проверьте тесты этого проекта " "=" 1
             echo \`\`\` 1>&2
-            exit $status
+            exit $news_status
+        elif [[ $note_status -ne 0 ]]
+        then
+            print_message " При запуске упали ваши тесты для проекта YaNote. Проверьте тесты этого проекта " "=" 1
+            echo \`\`\` 1>&2
+            exit $note_status
+        else
+            exit 0
         fi
     else
         status=$?
@@ -0,0 +1,10 @@
+import os
+
+
+def setup_django():
+    """Настраивает Django и создаёт чистую тестовую базу для замеров."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    import django
+    django.setup()
+    from django.db import connection
+    connection.creation.create_test_db(verbosity=0)
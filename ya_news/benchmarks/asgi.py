@@ -0,0 +1,183 @@
+"""
+Пропускная способность главной и страницы новости при одновременных
+читателях: WSGI с потоками против ASGI с синхронными и асинхронными
+представлениями.
+
+Сервер не поднимается: WSGIHandler вызывают потоки, как у
+многопоточного WSGI-сервера, а ASGIHandler — задачи одного цикла
+событий, как у uvicorn. Сетевой разбор HTTP у обоих вариантов
+одинаковый и в замер не входит.
+
+Запуск из каталога ya_news:
+
+    python -m benchmarks.asgi [читателей] [запросов на читателя]
+"""
+import asyncio
+import sys
+import threading
+import time
+from importlib import reload
+from io import BytesIO
+
+from benchmarks import setup_django
+
+NEWS = 20
+COMMENTS = 30
+
+
+def wsgi_environ(path):
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+    }
+
+
+def asgi_scope(path):
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+
+
+def run_wsgi(application, paths, readers, count):
+    latencies = []
+
+    def start_response(status, headers):
+        if not status.startswith('200'):
+            raise RuntimeError(status)
+
+    def reader():
+        for index in range(count):
+            started = time.perf_counter()
+            response = application(
+                wsgi_environ(paths[index % len(paths)]), start_response
+            )
+            b''.join(response)
+            response.close()
+            latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, latencies
+
+
+async def asgi_request(application, path):
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            if message['status'] != 200:
+                raise RuntimeError(message['status'])
+
+    await application(asgi_scope(path), receive, send)
+
+
+def run_asgi(application, paths, readers, count):
+    latencies = []
+
+    async def reader():
+        for index in range(count):
+            started = time.perf_counter()
+            await asgi_request(application, paths[index % len(paths)])
+            latencies.append(time.perf_counter() - started)
+
+    async def main():
+        started = time.perf_counter()
+        await asyncio.gather(*(reader() for _ in range(readers)))
+        return time.perf_counter() - started
+
+    return asyncio.run(main()), latencies
+
+
+def use_async_views(enabled):
+    from django.conf import settings
+    from django.urls import clear_url_caches
+
+    import news.urls
+    import yanews.urls
+
+    settings.NEWS_ASYNC_VIEWS = enabled
+    reload(news.urls)
+    reload(yanews.urls)
+    clear_url_caches()
+
+
+def main(readers, count):
+    setup_django()
+    from django.conf import settings
+
+    # Как в продакшене: шаблоны из кеша загрузчика, SQL не журналируется.
+    settings.DEBUG = False
+
+    from django.contrib.auth import get_user_model
+    from django.core.asgi import get_asgi_application
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import reverse
+
+    from news.counters import recount
+    from news.models import Comment, News
+    from yaperf.loadbench import percentile
+
+    author = get_user_model().objects.create(username='Автор')
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст новости. ' * 20)
+        for index in range(NEWS)
+    )
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for news in News.objects.all()
+        for index in range(COMMENTS)
+    )
+    recount(News.objects.all())
+    paths = [reverse('news:home')] + [
+        reverse('news:detail', args=(pk,))
+        for pk in News.objects.values_list('pk', flat=True)[:5]
+    ]
+
+    variants = (
+        ('WSGI, синхронные views', False, get_wsgi_application, run_wsgi),
+        ('ASGI, синхронные views', False, get_asgi_application, run_asgi),
+        ('ASGI, асинхронные views', True, get_asgi_application, run_asgi),
+    )
+    for name, async_views, application, run in variants:
+        use_async_views(async_views)
+        application = application()
+        # Прогрев: цепочка middleware, кеш карточек и страниц.
+        run(application, paths, 1, len(paths))
+        elapsed, latencies = run(application, paths, readers, count)
+        latencies.sort()
+        print(
+            f'{name}: {len(latencies) / elapsed:.0f} запросов/с, '
+            f'p50 {percentile(latencies, 50) * 1000:.1f} мс, '
+            f'p95 {percentile(latencies, 95) * 1000:.1f} мс'
+        )
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 32,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+    )
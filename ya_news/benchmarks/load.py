@@ -0,0 +1,80 @@
+"""
+Нагрузочный замер горячих страниц ya_news: главная, новость
+и отправка комментария.
+
+Запуск из каталога ya_news:
+
+    python manage.py loadbench --news 200 --comments 50 --output load.json
+    python manage.py loadbench --compare load.json
+    LOADBENCH_OUTPUT=load.json python -m pytest benchmarks/test_load.py -s
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from news.counters import recount
+from news.models import Comment, News
+from yaperf.loadbench import Scenario
+
+User = get_user_model()
+
+NEWS = 100
+COMMENTS_PER_NEWS = 20
+USERS = 20
+BATCH_SIZE = 500
+
+
+def seed(news_count=NEWS, comments_per_news=COMMENTS_PER_NEWS, users=USERS):
+    """Данные пачками через bulk_create; счётчики пересчитываются разом."""
+    User.objects.bulk_create(
+        User(username=f'reader{index}') for index in range(users)
+    )
+    authors = list(User.objects.order_by('pk'))
+    today = date.today()
+    News.objects.bulk_create(
+        (
+            News(
+                title=f'Новость {index}',
+                text=f'Текст новости номер {index}. ' * 10,
+                date=today - timedelta(days=index),
+            )
+            for index in range(news_count)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                news_id=news_id,
+                author=authors[index % len(authors)],
+                text=f'Комментарий {index}',
+            )
+            for news_id in News.objects.values_list('pk', flat=True)
+            for index in range(comments_per_news)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    recount(News.objects.all())
+    return {
+        'news': news_count,
+        'comments_per_news': comments_per_news,
+        'users': users,
+    }
+
+
+def scenarios():
+    reader = User.objects.order_by('pk').first()
+    detail_url = reverse('news:detail', args=(
+        News.objects.order_by('-date', '-pk').values_list(
+            'pk', flat=True
+        ).first(),
+    ))
+    return [
+        Scenario('news:home', reverse('news:home')),
+        Scenario('news:detail', detail_url),
+        Scenario(
+            'news:comment', detail_url, user=reader,
+            data=lambda number: {'text': f'Отзыв под нагрузкой {number}'},
+        ),
+    ]
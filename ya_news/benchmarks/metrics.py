@@ -0,0 +1,59 @@
+"""
+Накладные расходы PerformanceMiddleware на главной странице.
+
+Запросы с включённой и выключенной middleware чередуются сериями,
+берётся лучшая серия каждого варианта.
+
+Запуск из каталога ya_news:
+
+    python -m benchmarks.metrics [запросов в серии]
+"""
+import sys
+import time
+
+from benchmarks import setup_django
+
+ROUNDS = 15
+
+
+def best_time(client, url, count):
+    started = time.perf_counter()
+    for _ in range(count):
+        client.get(url)
+    return (time.perf_counter() - started) / count
+
+
+def main(count):
+    setup_django()
+    from django.conf import settings
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    from news.models import News
+
+    # Как в продакшене: шаблоны из кеша загрузчика, SQL не журналируется.
+    settings.DEBUG = False
+
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст новости. ' * 20)
+        for index in range(20)
+    )
+    clients = {}
+    for enabled in (False, True):
+        with override_settings(PERF_METRICS_ENABLED=enabled):
+            clients[enabled] = Client(SERVER_NAME='localhost')
+            # Цепочка middleware собирается при первом запросе.
+            clients[enabled].get('/')
+    for url in (reverse('news:home'), reverse('news:search') + '?q=текст'):
+        timings = {False: [], True: []}
+        for _ in range(ROUNDS):
+            for enabled, client in clients.items():
+                timings[enabled].append(best_time(client, url, count))
+        plain, measured = min(timings[False]), min(timings[True])
+        print(f'{url}: без метрик {plain * 1e6:.0f} мкс, '
+              f'с метриками {measured * 1e6:.0f} мкс, '
+              f'накладные расходы {(measured / plain - 1) * 100:+.1f}%')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,59 @@
+"""
+Сравнение автомата WordMatcher с проверкой `word in text` в цикле.
+
+Запуск из каталога ya_news:
+
+    python -m benchmarks.moderation
+"""
+import random
+import timeit
+
+from news.moderation import WordMatcher
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+WORD_COUNTS = (10, 1000, 10000)
+TEXT_LENGTHS = (100, 2000)
+REPEAT = 5
+
+
+def naive_find(words, text):
+    for word in words:
+        if word in text:
+            return word
+    return None
+
+
+def random_words(generator, count):
+    return [
+        ''.join(generator.choices(ALPHABET, k=generator.randint(6, 12)))
+        for _ in range(count)
+    ]
+
+
+def best_time(function, number):
+    return min(timeit.repeat(function, number=number, repeat=REPEAT)) / number
+
+
+def main():
+    generator = random.Random(0)
+    print(f'{"слов":>6} {"символов":>9} {"цикл, мкс":>11} '
+          f'{"автомат, мкс":>13} {"ускорение":>10}')
+    for word_count in WORD_COUNTS:
+        words = random_words(generator, word_count)
+        build = best_time(lambda: WordMatcher(words), 1)
+        matcher = WordMatcher(words)
+        for text_length in TEXT_LENGTHS:
+            # Текст без совпадений: худший случай для обоих способов.
+            text = ' '.join(random_words(generator, text_length // 9))
+            text = text[:text_length]
+            if naive_find(words, text) is not None:
+                continue
+            naive = best_time(lambda: naive_find(words, text), 20)
+            automaton = best_time(lambda: matcher.find(text), 20)
+            print(f'{word_count:>6} {text_length:>9} {naive * 1e6:>11.1f} '
+                  f'{automaton * 1e6:>13.1f} {naive / automaton:>9.1f}x')
+        print(f'{"":>6} построение автомата: {build * 1e3:.1f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Скорость поиска по новостям и комментариям на большом архиве.
+
+Запуск из каталога ya_news:
+
+    python -m benchmarks.search [число новостей]
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from benchmarks import setup_django
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщыэюя'
+VOCABULARY_SIZE = 20_000
+COMMENTS_PER_NEWS = 4
+# Запросы по частым, средним и редким словам словаря (закон Ципфа).
+QUERY_RANKS = ((5,), (100,), (5000,), (100, 300), (10, 5000))
+REPEAT = 20
+
+
+def vocabulary(generator):
+    return [
+        ''.join(generator.choices(ALPHABET, k=generator.randint(4, 9)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+
+
+def best_time(function):
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1e3
+
+
+def main(news_count):
+    setup_django()
+    from io import StringIO
+
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.test import RequestFactory
+
+    from news.models import Comment, News
+    from news.views import NewsSearch
+
+    generator = random.Random(0)
+    words = vocabulary(generator)
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+
+    def text(count):
+        return ' '.join(generator.choices(words, weights, k=count))
+
+    author = get_user_model().objects.create(username='Автор')
+    today = date.today()
+    News.objects.bulk_create(
+        News(
+            pk=pk, title=text(5), text=text(60),
+            date=today - timedelta(days=pk // 20),
+        )
+        for pk in range(1, news_count + 1)
+    )
+    Comment.objects.bulk_create(
+        Comment(news_id=pk, author=author, text=text(15))
+        for pk in range(1, news_count + 1)
+        for _ in range(COMMENTS_PER_NEWS)
+    )
+    started = time.perf_counter()
+    call_command('rebuild_news_search', stdout=StringIO())
+    print(f'индекс {news_count} новостей и '
+          f'{news_count * COMMENTS_PER_NEWS} комментариев за '
+          f'{time.perf_counter() - started:.1f} с')
+    view = NewsSearch.as_view()
+    factory = RequestFactory()
+
+    def search(**params):
+        return view(factory.get('/search/', params)).render()
+
+    for ranks in QUERY_RANKS:
+        query = ' '.join(words[rank] for rank in ranks)
+        found = len(search(q=query).context_data['results'])
+        first = best_time(lambda: search(q=query))
+        filtered = best_time(lambda: search(
+            q=query,
+            date_from=today - timedelta(days=news_count // 40),
+            date_to=today - timedelta(days=news_count // 80),
+        ))
+        print(f'  {query!r}: первая страница {first:.1f} мс '
+              f'(найдено {found}), за даты {filtered:.1f} мс')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
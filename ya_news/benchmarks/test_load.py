@@ -0,0 +1,37 @@
+"""
+Нагрузочный замер под pytest. Объёмы и файл отчёта — в переменных
+окружения LOADBENCH_NEWS, LOADBENCH_COMMENTS, LOADBENCH_USERS,
+LOADBENCH_REQUESTS и LOADBENCH_OUTPUT.
+
+Запуск из каталога ya_news:
+
+    python -m pytest benchmarks/test_load.py -s
+"""
+import os
+
+from benchmarks.load import COMMENTS_PER_NEWS, NEWS, USERS, scenarios, seed
+from yaperf.loadbench import (
+    REQUESTS, TRANSPORTS, bench_database, report, result_lines, run,
+    write_report,
+)
+
+
+def volume(name, default):
+    return int(os.environ.get(f'LOADBENCH_{name}', default))
+
+
+def test_load(django_db_blocker, tmp_path):
+    with django_db_blocker.unblock(), bench_database():
+        volumes = seed(
+            volume('NEWS', NEWS),
+            volume('COMMENTS', COMMENTS_PER_NEWS),
+            volume('USERS', USERS),
+        )
+        results = run(scenarios(), requests=volume('REQUESTS', REQUESTS))
+    data = report('ya_news', volumes, results)
+    write_report(
+        data, os.environ.get('LOADBENCH_OUTPUT', tmp_path / 'load.json')
+    )
+    for line in result_lines(data):
+        print(line)
+    assert {result['transport'] for result in results} == set(TRANSPORTS)
@@ -0,0 +1,132 @@
+"""
+Одновременные писатели комментариев и читатели ленты на файловой
+SQLite: стандартные настройки Django против yaperf.sqlite.
+
+Число потоков и запросов — в переменных окружения SQLITE_WRITERS,
+SQLITE_READERS и SQLITE_REQUESTS. Запуск из каталога ya_news:
+
+    python -m pytest benchmarks/test_sqlite.py -s
+"""
+import os
+import sys
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.signals import got_request_exception
+from django.db import OperationalError, connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from benchmarks.load import seed
+from news.models import Comment, News
+from yaperf.loadbench import bench_database
+
+User = get_user_model()
+
+WRITERS = 4
+READERS = 4
+REQUESTS = 25
+# Поведение Django по умолчанию: журнал отката, отложенные транзакции,
+# соединение на каждый запрос.
+STOCK = {
+    'OPTIONS': {'pragmas': {}, 'transaction_mode': 'DEFERRED'},
+    'CONN_MAX_AGE': 0,
+}
+TUNED = {'OPTIONS': {}, 'CONN_MAX_AGE': 60}
+
+
+def volume(name, default):
+    return int(os.environ.get(f'SQLITE_{name}', default))
+
+
+def client(user=None):
+    # Исключение из запроса тестовый клиент ловит сигналом, общим
+    # для всех потоков, и мог бы поднять его в чужом потоке.
+    client = Client(raise_request_exception=False)
+    if user is not None:
+        client.force_login(user)
+    return client
+
+
+def hammer(clients, send, requests):
+    def worker(client):
+        try:
+            for number in range(requests):
+                send(client, number)
+        finally:
+            connections.close_all()
+
+    threads = [
+        threading.Thread(target=worker, args=(client,)) for client in clients
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def run(variant, writers, readers, requests):
+    """Запросов в секунду и ошибки блокировки за прогон."""
+    saved = {key: connection.settings_dict[key] for key in variant}
+    connection.settings_dict.update(variant)
+    try:
+        with bench_database():
+            seed(news_count=10, comments_per_news=5, users=writers)
+            news = News.objects.first()
+            write_url = reverse('news:detail', args=(news.pk,))
+            read_urls = (reverse('news:home'), write_url)
+            authors = [
+                client(user) for user in User.objects.all()[:writers]
+            ]
+            before = Comment.objects.count()
+            errors = []
+
+            def record(sender, **kwargs):
+                error = sys.exc_info()[1]
+                if isinstance(error, OperationalError):
+                    errors.append(str(error))
+
+            got_request_exception.connect(record)
+            started = time.perf_counter()
+            threads = hammer(
+                authors,
+                lambda client, number: client.post(
+                    write_url, {'text': f'Комментарий {number}'}
+                ),
+                requests,
+            ) + hammer(
+                [client() for _ in range(readers)],
+                lambda client, number: client.get(
+                    read_urls[number % len(read_urls)]
+                ),
+                requests,
+            )
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            got_request_exception.disconnect(record)
+            written = Comment.objects.count() - before
+    finally:
+        connection.settings_dict.update(saved)
+    return (writers + readers) * requests / elapsed, errors, written
+
+
+def test_concurrent_writers_and_readers(django_db_blocker):
+    writers = volume('WRITERS', WRITERS)
+    readers = volume('READERS', READERS)
+    requests = volume('REQUESTS', REQUESTS)
+    # Отчёт об ошибке 500 печатает локальные переменные кадров,
+    # и каждый QuerySet в них — лишний SELECT: N+1 тут не ошибка.
+    with django_db_blocker.unblock(), override_settings(NPLUSONE_RAISE=False):
+        results = {
+            name: run(variant, writers, readers, requests)
+            for name, variant in (('стандартный', STOCK), ('yaperf', TUNED))
+        }
+    for name, (throughput, errors, written) in results.items():
+        print(
+            f'{name}: {throughput:.0f} запросов/с, '
+            f'комментариев {written}, ошибок блокировки {len(errors)}'
+        )
+    _, errors, written = results['yaperf']
+    assert errors == []
+    assert written == writers * requests
@@ -0,0 +1,174 @@
+import csv
+import json
+import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, News
+
+READ_SIZE = 64 * 1024
+CHUNK_SIZE = 2000
+CSV_COLUMNS = (
+    'model', 'pk', 'news', 'author', 'title', 'text', 'date', 'created',
+    'status',
+)
+WHITESPACE = ' \t\n\r'
+# Столько символов занимает самый длинный оборванный токен: «fals»
+# или «\uXXX».
+TOKEN_TAIL = 5
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+class RecordReader:
+    """
+    Записи архива по одной, без чтения файла целиком.
+
+    Поддерживаются JSON Lines и JSON-массив объектов (например, фикстура
+    loaddata). В памяти держится только ещё не разобранный хвост буфера.
+    """
+
+    decoder = json.JSONDecoder()
+
+    def __init__(self, file, read_size=READ_SIZE):
+        self.file = file
+        self.read_size = read_size
+        self.buffer, self.position, self.eof = '', 0, False
+
+    def refill(self):
+        chunk = self.file.read(self.read_size)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position, self.eof = 0, not chunk
+
+    def next_char(self):
+        """Первый непробельный символ или None в конце файла."""
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if self.eof:
+                return None
+            self.refill()
+
+    def truncated(self, error):
+        """
+        Запись оборвана концом буфера, а не испорчена.
+
+        Иначе одна битая запись в начале архива втянула бы в буфер весь
+        файл. Строка JSON не может содержать перевода строки, так что
+        и незакрытая кавычка не уводит дальше конца строки файла.
+        """
+        return (
+            error.pos >= len(self.buffer) - TOKEN_TAIL
+            or error.msg.startswith('Unterminated string')
+        )
+
+    def decode(self):
+        while True:
+            try:
+                record, self.position = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+            except json.JSONDecodeError as error:
+                if self.eof or not self.truncated(error):
+                    raise ArchiveError(f'Некорректный JSON: {error}')
+                self.refill()
+                continue
+            if not isinstance(record, dict):
+                raise ArchiveError(f'Ожидался объект, получено: {record!r}')
+            return record
+
+    def __iter__(self):
+        in_array = self.next_char() == '['
+        self.position += in_array
+        while True:
+            char = self.next_char()
+            if char is None:
+                return
+            if in_array and char in ',]':
+                self.position += 1
+                continue
+            yield self.decode()
+
+
+def read_records(file, read_size=READ_SIZE):
+    return iter(RecordReader(file, read_size))
+
+
+def archive_records(chunk_size=CHUNK_SIZE):
+    """
+    Новости, за каждой — её комментарии, в формате import_news.
+
+    Новости и комментарии читаются двумя курсорами в порядке id новости
+    и сливаются на лету, имя автора приходит из JOIN: память не растёт
+    с размером архива, а число запросов не зависит от числа новостей.
+    """
+    news_rows = News.objects.order_by('pk').values_list(
+        'pk', 'title', 'text', 'date'
+    ).iterator(chunk_size)
+    comment_rows = Comment.objects.order_by(
+        'news_id', 'created', 'pk'
+    ).values_list(
+        'pk', 'news_id', 'author__username', 'text', 'created', 'status'
+    ).iterator(chunk_size)
+    comment = next(comment_rows, None)
+    for pk, title, text, date in news_rows:
+        yield {
+            'model': 'news.news',
+            'pk': pk,
+            'fields': {'title': title, 'text': text, 'date': date},
+        }
+        # Комментарии новости, удалённой между двумя запросами.
+        while comment is not None and comment[1] < pk:
+            comment = next(comment_rows, None)
+        while comment is not None and comment[1] == pk:
+            comment_pk, news_id, author, text, created, status = comment
+            yield {
+                'model': 'news.comment',
+                'pk': comment_pk,
+                'fields': {
+                    'news': news_id,
+                    'author': author,
+                    'text': text,
+                    'created': created,
+                    'status': status,
+                },
+            }
+            comment = next(comment_rows, None)
+
+
+class Echo:
+    """Файл, который просто возвращает записанное (для csv.writer)."""
+
+    def write(self, value):
+        return value
+
+
+def jsonl_lines(records):
+    for record in records:
+        yield json.dumps(
+            record, cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+def csv_lines(records):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for record in records:
+        row = dict(record['fields'], model=record['model'], pk=record['pk'])
+        yield writer.writerow(
+            value.isoformat() if isinstance(value, datetime.date) else value
+            for value in (row.get(column, '') for column in CSV_COLUMNS)
+        )
+
+
+FORMATS = {
+    'jsonl': (jsonl_lines, 'application/jsonl'),
+    'csv': (csv_lines, 'text/csv'),
+}
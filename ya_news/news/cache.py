@@ -0,0 +1,188 @@
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.template.loader import render_to_string
+from django.utils.translation import get_language
+
+from .models import News
+from .replicas import primary_reads
+
+HOME_KEY = 'news:home'
+CARD_TEMPLATE = 'includes/news_card.html'
+# Кеши в памяти процесса не ждут ввода-вывода.
+IN_PROCESS_CACHES = (LocMemCache, DummyCache)
+
+
+def version_key(pk):
+    return f'news:{pk}:version'
+
+
+def comments_version_key(pk):
+    return f'news:{pk}:comments_version'
+
+
+def card_key(pk, version, comment_count):
+    """Ключ карточки меняется вместе с новостью и числом комментариев."""
+    return f'news:{pk}:card:{version}:{comment_count}:{get_language()}'
+
+
+def invalidate_home(pk=None):
+    """
+    Сбрасывает список новостей главной страницы.
+
+    Если передан pk, удаляются и все закешированные карточки этой новости,
+    остальные карточки переживают пересборку списка.
+    """
+    index = cache.get(HOME_KEY)
+    if pk is not None and index is not None:
+        cache.delete_many(
+            [key for key, news_pk in index if news_pk == pk]
+        )
+    cache.delete(HOME_KEY)
+
+
+def bump_version(pk):
+    """Новость изменилась: её карточки больше не годятся."""
+    cache.set(version_key(pk), time.time_ns(), None)
+    invalidate_home(pk)
+
+
+def render_cards(news_list, keys):
+    cards = {
+        key: render_to_string(CARD_TEMPLATE, {'news': news})
+        for key, news in zip(keys, news_list)
+    }
+    cache.set_many(cards, settings.NEWS_HOME_CACHE_TIMEOUT)
+    return cards
+
+
+@primary_reads()
+def home_cards(queryset, count):
+    """
+    Отрисованные карточки первых count новостей из queryset.
+
+    Список ключей карточек хранится в кеше, поэтому на прогретом кеше
+    главная страница не обращается к базе. Запрос выполняется только при
+    пересборке списка или для карточек, вытесненных из кеша, и всегда
+    к основной базе: отставшая реплика осталась бы в кеше на час.
+    """
+    index = cache.get(HOME_KEY)
+    if index is None:
+        news_list = list(queryset[:count])
+        versions = cache.get_many(
+            [version_key(news.pk) for news in news_list]
+        )
+        index = [
+            (
+                card_key(
+                    news.pk,
+                    versions.get(version_key(news.pk), 0),
+                    news.comment_count,
+                ),
+                news.pk,
+            )
+            for news in news_list
+        ]
+        cache.set(HOME_KEY, index, settings.NEWS_HOME_CACHE_TIMEOUT)
+        cards = cache.get_many([key for key, _ in index])
+        missing = [
+            (key, news) for (key, _), news in zip(index, news_list)
+            if key not in cards
+        ]
+    else:
+        cards = cache.get_many([key for key, _ in index])
+        missing_keys = {
+            news_pk: key for key, news_pk in index if key not in cards
+        }
+        missing = [
+            (missing_keys[news.pk], news)
+            for news in queryset.filter(pk__in=missing_keys)
+        ] if missing_keys else []
+    if missing:
+        keys, news_list = zip(*missing)
+        cards.update(render_cards(news_list, keys))
+    return [cards[key] for key, _ in index]
+
+
+async def cache_call(method, *args):
+    """
+    Обращение к кешу из асинхронного view.
+
+    В Django 3.2 у кеша нет асинхронного API. Кеш в памяти процесса
+    вызывается прямо в цикле событий, сетевые бэкенды — в пуле потоков,
+    не занимая поток, в котором работает ORM.
+    """
+    backend = caches[DEFAULT_CACHE_ALIAS]
+    function = getattr(backend, method)
+    if isinstance(backend, IN_PROCESS_CACHES):
+        return function(*args)
+    return await sync_to_async(function, thread_sensitive=False)(*args)
+
+
+async def cached_home_cards():
+    """
+    Карточки главной страницы, если все они в кеше, иначе None.
+
+    Пересборку списка и карточек с запросом к базе делает home_cards.
+    """
+    index = await cache_call('get', HOME_KEY)
+    if index is None:
+        return None
+    cards = await cache_call('get_many', [key for key, _ in index])
+    if len(cards) < len(index):
+        return None
+    return [cards[key] for key, _ in index]
+
+
+def comments_changed(pk):
+    """
+    Изменились комментарии новости.
+
+    Сбрасывается карточка новости на главной и версия её комментариев:
+    правка и удаление комментария не меняют дату последнего из них.
+    """
+    cache.set(comments_version_key(pk), time.time_ns(), None)
+    invalidate_home(pk)
+
+
+def detail_etag(pk, cursor):
+    """
+    Значение ETag страницы новости.
+
+    Считается по строке новости, где хранятся число комментариев и дата
+    последнего из них; версии из кеша учитывают правки и модерацию.
+    Из адреса страница зависит только от курсора комментариев: прочие
+    параметры не должны плодить копии страницы в общем кеше.
+    Last-Modified не отдаём: честной даты изменения у новости нет.
+    Если новости нет, возвращает None.
+    """
+    row = News.objects.filter(pk=pk).values(
+        'title', 'text', 'date', 'comment_count', 'last_commented_at'
+    ).first()
+    if row is None:
+        return None
+    versions = cache.get_many(
+        [version_key(pk), comments_version_key(pk)]
+    )
+    fingerprint = '\n'.join(map(str, (
+        pk,
+        row['title'],
+        row['text'],
+        row['date'],
+        row['comment_count'],
+        row['last_commented_at'],
+        versions.get(version_key(pk)),
+        versions.get(comments_version_key(pk)),
+        cursor,
+        get_language(),
+    )))
+    return '"{}"'.format(hashlib.md5(fingerprint.encode()).hexdigest())
+
+
+def detail_key(pk, etag):
+    return f'news:{pk}:detail:{etag}'
@@ -0,0 +1,89 @@
+from collections import Counter
+from contextvars import ContextVar
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, News
+
+# Новости, удаляемые каскадом вместе с комментариями: их счётчики
+# обновлять незачем.
+deleting_news = ContextVar('deleting_news', default=frozenset())
+
+
+def published_count():
+    return Coalesce(Subquery(
+        Comment.objects.published().filter(
+            news=OuterRef('pk')
+        ).order_by().values('news').annotate(
+            count=Count('pk')
+        ).values('count')
+    ), 0)
+
+
+def last_published():
+    return Subquery(
+        Comment.objects.published().filter(
+            news=OuterRef('pk')
+        ).order_by('-created').values('created')[:1]
+    )
+
+
+def comment_added(comment):
+    if comment.status != Comment.Status.PUBLISHED:
+        return
+    News.objects.filter(pk=comment.news_id).update(
+        comment_count=F('comment_count') + 1,
+        last_commented_at=comment.created,
+    )
+
+
+def comment_removed(comment, status=None):
+    if (status or comment.status) != Comment.Status.PUBLISHED:
+        return
+    News.objects.filter(pk=comment.news_id).update(
+        comment_count=F('comment_count') - 1,
+        last_commented_at=last_published(),
+    )
+
+
+def comment_changed(comment):
+    """Правка комментария меняет счётчик, только если сменился статус."""
+    loaded_status = getattr(comment, 'loaded_status', None)
+    if loaded_status is None:
+        recount(News.objects.filter(pk=comment.news_id))
+    elif loaded_status != comment.status:
+        comment_removed(comment, loaded_status)
+        comment_added(comment)
+    comment.loaded_status = comment.status
+
+
+def comments_published(comments):
+    """
+    Прибавляет к счётчикам новостей пачку опубликованных комментариев.
+
+    comments — пары (news_id, created). Обходится без пересчёта всех
+    комментариев новости, поэтому цена пачки не растёт вместе с ними;
+    расхождения исправляет reconcile_counters.
+    """
+    counts, latest = Counter(), {}
+    for news_id, created in comments:
+        counts[news_id] += 1
+        latest[news_id] = max(latest.get(news_id, created), created)
+    for news_id, count in counts.items():
+        # В SQLite MAX с NULL даёт NULL.
+        created = Value(latest[news_id])
+        News.objects.filter(pk=news_id).update(
+            comment_count=F('comment_count') + count,
+            last_commented_at=Greatest(
+                Coalesce('last_commented_at', created), created
+            ),
+        )
+
+
+def recount(news):
+    """Пересчитывает счётчики новостей одним UPDATE."""
+    return news.update(
+        comment_count=published_count(),
+        last_commented_at=last_published(),
+    )
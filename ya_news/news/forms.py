@@ -1,14 +1,14 @@
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django import forms
 from django.forms import ModelForm
 
 from .models import Comment
+from .moderation import get_matcher, load_bad_words
 
-BAD_WORDS = (
-    'редиска',
-    'негодяй',
-    # Дополните список на своё усмотрение.
-)
+BAD_WORDS = load_bad_words()
 WARNING = 'Не ругайтесь!'
+DATE_WIDGET = forms.DateInput(format='%Y-%m-%d', attrs={'type': 'date'})
 
 
 class CommentForm(ModelForm):
@@ -18,10 +18,26 @@ class CommentForm(ModelForm):
         fields = ('text',)
 
     def clean_text(self):
-        """Не позволяем ругаться в комментариях."""
+        """
+        Не позволяем ругаться в комментариях.
+
+        В режиме фоновой модерации комментарий сохраняется на проверку,
+        её выполняет команда moderate_comments.
+        """
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        if settings.COMMENTS_MODERATION_ASYNC:
+            self.instance.status = Comment.Status.PENDING
+            return text
+        if get_matcher().find(text.lower()) is not None:
+            raise ValidationError(WARNING)
         return text
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(label='Запрос', max_length=200)
+    date_from = forms.DateField(
+        label='С даты', required=False, widget=DATE_WIDGET
+    )
+    date_to = forms.DateField(
+        label='По дату', required=False, widget=DATE_WIDGET
+    )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from news.archive import CHUNK_SIZE, FORMATS, archive_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает новости с комментариями в JSON Lines или CSV '
+        'потоком, в формате import_news.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=FORMATS, default='jsonl', dest='export_format'
+        )
+        parser.add_argument(
+            '--output', default='-', help='Файл или - для stdout.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        lines, _ = FORMATS[options['export_format']]
+        lines = lines(archive_records(options['chunk_size']))
+        if options['output'] == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(
+            options['output'], 'w', encoding='utf-8', newline=''
+        ) as file:
+            file.writelines(lines)
@@ -0,0 +1,206 @@
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from news.archive import ArchiveError, read_records
+from news.cache import comments_changed, invalidate_home
+from news.counters import comments_published
+from news.models import Comment, News
+from news.search import get_backend
+
+User = get_user_model()
+
+
+@contextmanager
+def keep_created():
+    """bulk_create иначе затрёт дату архивного комментария текущей."""
+    field = Comment._meta.get_field('created')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def parse_created(value):
+    created = parse_datetime(value) if value else timezone.now()
+    if created is None:
+        raise ArchiveError(f'Некорректная дата комментария: {value!r}')
+    if timezone.is_naive(created):
+        created = timezone.make_aware(created)
+    return created
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает новости и комментарии из JSON Lines или JSON-массива '
+        'в формате сериализации Django; автор комментария указывается '
+        'по username.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл архива или - для stdin.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.verbosity = options['verbosity']
+        self.authors = {}
+        self.news, self.comments = [], []
+        self.imported_news = self.imported_comments = self.skipped = 0
+        self.started = time.monotonic()
+        path = options['path']
+        file = (
+            sys.stdin if path == '-' else open(path, encoding='utf-8')
+        )
+        try:
+            with keep_created():
+                for number, record in enumerate(read_records(file), 1):
+                    self.add(number, record)
+                self.flush()
+        except ArchiveError as error:
+            raise CommandError(error)
+        finally:
+            if file is not sys.stdin:
+                file.close()
+        invalidate_home()
+        self.report()
+
+    def add(self, number, record):
+        fields = record.get('fields', {})
+        model = record.get('model')
+        try:
+            if model == 'news.news':
+                self.news.append(self.build_news(record.get('pk'), fields))
+            elif model == 'news.comment':
+                self.comments.append(
+                    self.build_comment(record.get('pk'), fields)
+                )
+            else:
+                raise ArchiveError(f'Неизвестная модель {model!r}')
+        except (ArchiveError, KeyError, TypeError, ValueError) as error:
+            raise ArchiveError(f'Запись {number}: {error!r}')
+        if len(self.news) + len(self.comments) >= self.batch_size:
+            self.flush()
+
+    @staticmethod
+    def build_news(pk, fields):
+        date = fields.get('date')
+        return News(
+            pk=pk,
+            title=fields['title'],
+            text=fields['text'],
+            date=parse_date(date) if date else datetime.today(),
+        )
+
+    @staticmethod
+    def build_comment(pk, fields):
+        author = fields['author']
+        # Натуральный ключ пользователя из dumpdata — список.
+        username = author[0] if isinstance(author, list) else author
+        return username, Comment(
+            pk=pk,
+            news_id=fields['news'],
+            text=fields['text'],
+            created=parse_created(fields.get('created')),
+            status=fields.get('status', Comment.Status.PUBLISHED),
+        )
+
+    def resolve_authors(self):
+        """Неизвестные авторы пачки запрашиваются одним запросом."""
+        unknown = {
+            username for username, _ in self.comments
+        } - self.authors.keys()
+        if unknown:
+            self.authors.update(
+                User.objects.filter(username__in=unknown).values_list(
+                    'username', 'pk'
+                )
+            )
+        comments = []
+        for username, comment in self.comments:
+            author_id = self.authors.get(username)
+            if author_id is None:
+                self.skipped += 1
+                continue
+            comment.author_id = author_id
+            comments.append(comment)
+        return comments
+
+    @staticmethod
+    def last_pk(model, objects):
+        """Максимальный id до вставки, если у части записей id нет."""
+        if all(obj.pk is not None for obj in objects):
+            return None
+        return model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+
+    @staticmethod
+    def created(queryset, objects, last_pk):
+        """
+        Вставленные строки для поискового индекса.
+
+        bulk_create в SQLite не возвращает id, поэтому записи без id
+        читаются из базы по id больше прежнего максимума.
+        """
+        if last_pk is None:
+            return objects
+        return [obj for obj in objects if obj.pk is not None] + list(
+            queryset.filter(pk__gt=last_pk)
+        )
+
+    def index(self, comments, news_floor, comments_floor):
+        backend = get_backend()
+        backend.index_news(self.created(
+            News.objects.only('id', 'title', 'text'), self.news, news_floor
+        ))
+        backend.index_comments(self.created(
+            Comment.objects.only('id', 'news_id', 'text', 'status'),
+            comments,
+            comments_floor,
+        ))
+
+    def flush(self):
+        comments = self.resolve_authors()
+        news_ids = {comment.news_id for comment in comments}
+        try:
+            with transaction.atomic():
+                floors = (
+                    self.last_pk(News, self.news),
+                    self.last_pk(Comment, comments),
+                )
+                News.objects.bulk_create(self.news)
+                Comment.objects.bulk_create(comments)
+                comments_published(
+                    (comment.news_id, comment.created)
+                    for comment in comments
+                    if comment.status == Comment.Status.PUBLISHED
+                )
+                self.index(comments, *floors)
+        except DatabaseError as error:
+            raise CommandError(f'Пачка не загружена: {error}')
+        for news_id in news_ids:
+            comments_changed(news_id)
+        self.imported_news += len(self.news)
+        self.imported_comments += len(comments)
+        self.news, self.comments = [], []
+        if self.verbosity > 1:
+            self.report()
+
+    def report(self):
+        rows = self.imported_news + self.imported_comments
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        self.stdout.write(
+            f'Новостей: {self.imported_news}, '
+            f'комментариев: {self.imported_comments}, '
+            f'пропущено (нет автора): {self.skipped}, '
+            f'{rows / elapsed:.0f} строк/с'
+        )
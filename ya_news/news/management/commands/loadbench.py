@@ -0,0 +1,18 @@
+from benchmarks.load import COMMENTS_PER_NEWS, NEWS, USERS, scenarios, seed
+from yaperf.loadbench import LoadBenchCommand
+
+
+class Command(LoadBenchCommand):
+    project = 'ya_news'
+
+    def add_volume_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=NEWS)
+        parser.add_argument(
+            '--comments', type=int, default=COMMENTS_PER_NEWS,
+            help='Комментариев у каждой новости.',
+        )
+        parser.add_argument('--users', type=int, default=USERS)
+
+    def seed(self, options):
+        volumes = seed(options['news'], options['comments'], options['users'])
+        return volumes, scenarios()
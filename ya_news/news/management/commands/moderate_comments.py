@@ -0,0 +1,134 @@
+import os
+import time
+from multiprocessing import Pool
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.cache import comments_changed
+from news.counters import comments_published
+from news.models import Comment
+from news.moderation import WordMatcher, moderation_list
+from news.search import get_backend
+
+_matcher = None
+
+
+def init_worker(words):
+    global _matcher
+    _matcher = WordMatcher(words)
+
+
+def is_clean(text):
+    return _matcher.find(text.lower()) is None
+
+
+class Command(BaseCommand):
+    help = (
+        'Проверяет комментарии, ожидающие модерации, пачками в пуле '
+        'процессов и публикует или отклоняет их.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов; 0 — проверять в текущем процессе.',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--interval', type=float, default=1,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        self.pool = None
+        self.matcher = None
+        try:
+            while True:
+                moderated = self.moderate_batch(
+                    options['workers'], options['batch_size']
+                )
+                if moderated:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            if self.pool is not None:
+                self.pool.terminate()
+
+    def verdicts(self, workers, texts):
+        """Пул пересоздаётся, если список запрещённых слов изменился."""
+        matcher = moderation_list.get_matcher()
+        if not workers:
+            return [matcher.find(text.lower()) is None for text in texts]
+        if matcher is not self.matcher:
+            if self.pool is not None:
+                self.pool.terminate()
+            self.pool = Pool(
+                workers, initializer=init_worker,
+                initargs=(moderation_list.words,)
+            )
+            self.matcher = matcher
+        return self.pool.map(
+            is_clean, texts, chunksize=max(len(texts) // workers, 1)
+        )
+
+    def apply(self, checked, verdicts):
+        """
+        Решения по комментариям, текст которых не менялся с проверки.
+
+        Исправленный комментарий снова ждёт модерации, и опубликовать
+        его непроверенный текст нельзя: строки перечитываются внутри
+        транзакции.
+        """
+        pending = Comment.objects.filter(status=Comment.Status.PENDING)
+        published, rejected = [], []
+        for pk, news_id, text, created in pending.filter(
+            pk__in=list(checked)
+        ).values_list('pk', 'news_id', 'text', 'created'):
+            if text != checked[pk]:
+                continue
+            if verdicts[pk]:
+                published.append(Comment(
+                    pk=pk, news_id=news_id, text=text, created=created,
+                    status=Comment.Status.PUBLISHED,
+                ))
+            else:
+                rejected.append(pk)
+        pending.filter(
+            pk__in=[comment.pk for comment in published]
+        ).update(status=Comment.Status.PUBLISHED)
+        pending.filter(pk__in=rejected).update(
+            status=Comment.Status.REJECTED
+        )
+        comments_published(
+            (comment.news_id, comment.created) for comment in published
+        )
+        get_backend().index_comments(published)
+        return published, rejected
+
+    def moderate_batch(self, workers, batch_size):
+        batch = list(
+            Comment.objects.filter(
+                status=Comment.Status.PENDING
+            ).order_by('pk').values_list('pk', 'text')[
+                :batch_size
+            ]
+        )
+        if not batch:
+            return 0
+        pks, texts = zip(*batch)
+        verdicts = dict(zip(pks, self.verdicts(workers, texts)))
+        with transaction.atomic():
+            published, rejected = self.apply(dict(zip(pks, texts)), verdicts)
+        for news_id in {comment.news_id for comment in published}:
+            comments_changed(news_id)
+        self.stdout.write(
+            f'Опубликовано: {len(published)}, отклонено: {len(rejected)}'
+        )
+        return len(batch)
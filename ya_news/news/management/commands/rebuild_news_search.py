@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.models import Comment, News
+from news.search import get_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает поисковый индекс новостей и комментариев пачками '
+        'по id: основные таблицы только читаются короткими запросами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.clear()
+        news = self.index(
+            News.objects.only('id', 'title', 'text'),
+            backend.index_news,
+            options['batch_size'],
+        )
+        comments = self.index(
+            Comment.objects.published().only(
+                'id', 'news_id', 'text', 'status'
+            ),
+            backend.index_comments,
+            options['batch_size'],
+        )
+        self.stdout.write(
+            f'Проиндексировано новостей: {news}, комментариев: {comments} '
+            f'({type(backend).__name__})'
+        )
+
+    @staticmethod
+    def index(queryset, index, batch_size):
+        last_pk, indexed = 0, 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk).order_by('pk')[:batch_size]
+            )
+            if not batch:
+                return indexed
+            with transaction.atomic():
+                index(batch)
+            last_pk = batch[-1].pk
+            indexed += len(batch)
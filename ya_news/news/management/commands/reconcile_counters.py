@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from news.counters import last_published, published_count, recount
+from news.models import News
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает разошедшиеся счётчики комментариев новостей '
+        'пачками по id.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        last_pk, checked, fixed = 0, 0, 0
+        while True:
+            rows = News.objects.filter(pk__gt=last_pk).order_by(
+                'pk'
+            ).annotate(
+                actual_count=published_count(),
+                actual_last=last_published(),
+            ).values_list(
+                'pk', 'comment_count', 'last_commented_at',
+                'actual_count', 'actual_last',
+            )[:options['batch_size']]
+            rows = list(rows)
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            drifted = [
+                pk for pk, count, last, actual_count, actual_last in rows
+                if (count, last) != (actual_count, actual_last)
+            ]
+            # Пересчёт в самом UPDATE не затрёт комментарии, добавленные
+            # после чтения пачки.
+            if drifted:
+                fixed += recount(News.objects.filter(pk__in=drifted))
+            checked += len(rows)
+        self.stdout.write(
+            f'Проверено новостей: {checked}, исправлено: {fixed}'
+        )
@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from news.replicas import replicate
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу в реплики из NEWS_REPLICAS: замена '
+        'репликации для локального запуска с settings_replica.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять каждые столько секунд — задержка репликации; '
+                 '0 — скопировать один раз.',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.NEWS_REPLICAS:
+            raise CommandError('Реплики не настроены: NEWS_REPLICAS пуст.')
+        while True:
+            replicate()
+            self.stdout.write(
+                f'Реплики обновлены: {", ".join(settings.NEWS_REPLICAS)}'
+            )
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
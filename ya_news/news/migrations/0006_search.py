@@ -0,0 +1,49 @@
+# Generated by Django 3.2.15 on 2026-10-18 21:10
+
+from django.db import migrations
+
+FTS_TABLE = 'news_search'
+
+
+def fold(column):
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def create_search_table(apps, schema_editor):
+    """
+    Индекс FTS5 с уже существующими новостями и комментариями.
+
+    Для других СУБД нужен свой движок в NEWS_SEARCH_BACKEND.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+        "news, title, body, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE} (rowid, news, title, body) '
+        f"SELECT 2 * id, 'n' || id, {fold('title')}, {fold('text')} "
+        'FROM news_news'
+    )
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE} (rowid, news, title, body) '
+        f"SELECT 2 * id + 1, 'n' || news_id, '', {fold('text')} "
+        "FROM news_comment WHERE status = 'published'"
+    )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_news_comment_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -8,17 +8,36 @@ class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    last_commented_at = models.DateTimeField(
+        null=True, blank=True, editable=False
+    )
 
     class Meta:
         ordering = ('-date',)
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
+        indexes = (
+            models.Index(fields=('date', 'id'), name='news_date_id_idx'),
+        )
 
     def __str__(self):
         return self.title
 
 
+class CommentQuerySet(models.QuerySet):
+
+    def published(self):
+        return self.filter(status=Comment.Status.PUBLISHED)
+
+
 class Comment(models.Model):
+
+    class Status(models.TextChoices):
+        PUBLISHED = 'published', 'Опубликован'
+        PENDING = 'pending', 'На модерации'
+        REJECTED = 'rejected', 'Отклонён'
+
     news = models.ForeignKey(
         News,
         on_delete=models.CASCADE
@@ -29,9 +48,59 @@ class Comment(models.Model):
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PUBLISHED,
+    )
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx',
+            ),
+            models.Index(
+                fields=('author', 'created'),
+                name='comment_author_created_idx',
+            ),
+            models.Index(
+                fields=('id',),
+                condition=models.Q(status='pending'),
+                name='comment_pending_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминаем статус из базы, чтобы заметить его смену."""
+        comment = super().from_db(db, field_names, values)
+        comment.loaded_status = comment.__dict__.get('status')
+        return comment
+
+
+class BadWord(models.Model):
+    word = models.CharField(
+        'Слово',
+        max_length=100,
+        unique=True,
+        help_text='Комментарии с этим словом в любом регистре запрещены',
+    )
+
+    class Meta:
+        ordering = ('word',)
+        verbose_name_plural = 'Запрещённые слова'
+        verbose_name = 'Запрещённое слово'
+
+    def __str__(self):
+        return self.word
+
+    def save(self, *args, **kwargs):
+        self.word = self.word.lower()
+        super().save(*args, **kwargs)
@@ -0,0 +1,159 @@
+import time
+from collections import deque
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import BadWord
+
+VERSION_KEY = 'news:moderation:version'
+
+DEFAULT_BAD_WORDS = (
+    'редиска',
+    'негодяй',
+    # Дополните список на своё усмотрение.
+)
+
+
+class WordMatcher:
+    """
+    Автомат Ахо — Корасик для списка запрещённых слов.
+
+    Строится один раз и за один проход по тексту находит любое слово
+    из списка как подстроку, то есть ведёт себя как проверка
+    `word in text` для каждого слова, но не зависит от длины списка.
+    """
+
+    def __init__(self, words):
+        self.transitions = [{}]
+        self.fail = [0]
+        self.found = [None]
+        for word in words:
+            self._add(word)
+        self._link()
+
+    def _add(self, word):
+        state = 0
+        for char in word:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions.append({})
+                self.fail.append(0)
+                self.found.append(None)
+                self.transitions[state][char] = next_state
+            state = next_state
+        if self.found[state] is None:
+            self.found[state] = word
+
+    def _link(self):
+        """Суффиксные ссылки строятся обходом бора в ширину."""
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                link = self.transitions[fallback].get(char, 0)
+                self.fail[next_state] = link
+                if self.found[next_state] is None:
+                    self.found[next_state] = self.found[link]
+
+    def find(self, text):
+        """Первое найденное в тексте слово или None."""
+        if self.found[0] is not None:
+            return self.found[0]
+        transitions, fail, found = self.transitions, self.fail, self.found
+        state = 0
+        for char in text:
+            while state and char not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(char, 0)
+            if found[state] is not None:
+                return found[state]
+        return None
+
+
+def load_bad_words():
+    """
+    Список запрещённых слов из настроек.
+
+    Берётся из файла BAD_WORDS_FILE (по слову в строке, строки с # —
+    комментарии), из настройки BAD_WORDS или из списка по умолчанию.
+    """
+    path = getattr(settings, 'BAD_WORDS_FILE', None)
+    if path:
+        with Path(path).open(encoding='utf-8') as file:
+            return tuple(
+                word for word in (line.strip() for line in file)
+                if word and not word.startswith('#')
+            )
+    return tuple(getattr(settings, 'BAD_WORDS', DEFAULT_BAD_WORDS))
+
+
+def words_file_stamp():
+    path = getattr(settings, 'BAD_WORDS_FILE', None)
+    return Path(path).stat().st_mtime_ns if path else None
+
+
+class ModerationList:
+    """
+    Скомпилированный список запрещённых слов в памяти процесса.
+
+    Слова из настроек дополняются словами из базы. Общая метка версии
+    лежит в кеше Django: её меняет любой процесс при правке списка,
+    а остальные замечают это не чаще раза в MODERATION_CHECK_INTERVAL
+    секунд и лениво пересобирают автомат. Проверка комментария сама
+    по себе ни к кешу, ни к базе не обращается.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.words = None
+        self.matcher = None
+        self.version = None
+        self.file_stamp = None
+        self.checked_at = None
+
+    def get_matcher(self):
+        now = time.monotonic()
+        if (
+            self.matcher is None
+            or now - self.checked_at >= settings.MODERATION_CHECK_INTERVAL
+        ):
+            self.checked_at = now
+            version = cache.get(VERSION_KEY)
+            file_stamp = words_file_stamp()
+            if (
+                self.matcher is None
+                or version != self.version
+                or file_stamp != self.file_stamp
+            ):
+                self.reload(version, file_stamp)
+        return self.matcher
+
+    def reload(self, version, file_stamp):
+        self.words = load_bad_words() + tuple(
+            BadWord.objects.values_list('word', flat=True)
+        )
+        self.matcher = WordMatcher(self.words)
+        self.version = version
+        self.file_stamp = file_stamp
+
+    def bump(self):
+        """Список изменился: все процессы пересоберут автомат."""
+        version = time.time_ns()
+        cache.set(VERSION_KEY, version, None)
+        self.reload(version, words_file_stamp())
+
+
+moderation_list = ModerationList()
+
+
+def get_matcher():
+    return moderation_list.get_matcher()
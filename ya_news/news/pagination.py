@@ -0,0 +1,84 @@
+from datetime import date, datetime, timedelta, timezone
+
+from django.db.models import Q
+from django.http import Http404
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+# Больше не примет SQLite: int64 в параметре запроса.
+MAX_INT = 2 ** 63 - 1
+
+
+def cursor_parts(cursor):
+    """Два числа курсора через дефис; каждое помещается в int64."""
+    first, second = (int(part) for part in cursor.split('-'))
+    if first > MAX_INT or second > MAX_INT:
+        raise ValueError(cursor)
+    return first, second
+
+
+def encode_cursor(comment):
+    """Курсор на комментарий: момент создания в микросекундах и id."""
+    return f'{(comment.created - EPOCH) // MICROSECOND}-{comment.pk}'
+
+
+def decode_cursor(cursor):
+    """Разбирает курсор, на некорректный отвечаем 404."""
+    try:
+        created, pk = cursor_parts(cursor)
+        return EPOCH + created * MICROSECOND, pk
+    except (ValueError, OverflowError):
+        raise Http404('Некорректный курсор.')
+
+
+def encode_news_cursor(news):
+    """Курсор на новость: номер дня даты и id."""
+    return f'{news.date.toordinal()}-{news.pk}'
+
+
+def decode_news_cursor(cursor):
+    try:
+        day, pk = cursor_parts(cursor)
+        return date.fromordinal(day), pk
+    except (ValueError, OverflowError):
+        raise Http404('Некорректный курсор.')
+
+
+def after_cursor(queryset, cursor):
+    """
+    Комментарии, идущие после курсора.
+
+    Порядок совпадает с Comment.Meta.ordering с добавлением id, поэтому
+    база продолжает чтение индекса с места курсора без OFFSET.
+    """
+    queryset = queryset.order_by('created', 'pk')
+    if not cursor:
+        return queryset
+    created, pk = decode_cursor(cursor)
+    return queryset.filter(
+        Q(created__gt=created) | Q(created=created, pk__gt=pk)
+    )
+
+
+def comments_page(queryset, cursor, size):
+    """Страница комментариев и курсор следующей страницы (или None)."""
+    comments = list(after_cursor(queryset, cursor)[:size + 1])
+    if len(comments) > size:
+        return comments[:size], encode_cursor(comments[size - 1])
+    return comments, None
+
+
+def news_page(queryset, cursor, size):
+    """
+    Страница новостей от свежих к старым и курсор следующей.
+
+    Порядок (date, id) по убыванию читается по индексу news_date_id_idx.
+    """
+    queryset = queryset.order_by('-date', '-pk')
+    if cursor:
+        day, pk = decode_news_cursor(cursor)
+        queryset = queryset.filter(Q(date__lt=day) | Q(date=day, pk__lt=pk))
+    news_list = list(queryset[:size + 1])
+    if len(news_list) > size:
+        return news_list[:size], encode_news_cursor(news_list[size - 1])
+    return news_list, None
@@ -3,20 +3,45 @@ import pytest
 from datetime import datetime, timedelta
 
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test.client import Client
 from django.utils import timezone
 
+from news.counters import recount
 from news.models import Comment, News
+from news.moderation import moderation_list
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    moderation_list.reset()
+
+
+@pytest.fixture(scope='session')
+def users(django_db_setup, django_db_blocker):
+    """
+    Пользователи одни на весь прогон.
+
+    Тесты их не меняют и не удаляют, а транзакционных тестов, которые
+    очищают базу целиком, в наборе нет.
+    """
+    with django_db_blocker.unblock():
+        return {
+            username: get_user_model().objects.create(username=username)
+            for username in ('Автор', 'Не автор')
+        }
 
 
 @pytest.fixture
-def author(django_user_model):
-    return django_user_model.objects.create(username='Автор')
+def author(db, users):
+    return users['Автор']
 
 
 @pytest.fixture
-def not_author(django_user_model):
-    return django_user_model.objects.create(username='Не автор')
+def not_author(db, users):
+    return users['Не автор']
 
 
 @pytest.fixture
@@ -95,8 +120,18 @@ def news_id_for_args(news):
     return (news.id,)
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def form_data():
     return {
         'text': 'Новый техт'
     }
+
+
+@pytest.fixture
+def many_comments(news, author):
+    comments = Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Текст {index}')
+        for index in range(100)
+    )
+    recount(News.objects.filter(pk=news.pk))
+    return comments
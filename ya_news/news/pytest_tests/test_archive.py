@@ -0,0 +1,176 @@
+import pytest
+
+import csv
+import json
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+
+from news.archive import (
+    CSV_COLUMNS, ArchiveError, archive_records, read_records
+)
+from news.models import Comment, News
+
+EXPORT_URL = reverse('news:export')
+
+RECORDS = (
+    {
+        'model': 'news.news',
+        'pk': 100,
+        'fields': {'title': 'Архив', 'text': 'Текст', 'date': '2020-01-02'},
+    },
+    {
+        'model': 'news.comment',
+        'fields': {
+            'news': 100,
+            'author': 'Автор',
+            'text': 'Старый комментарий',
+            'created': '2020-01-03T10:00:00+00:00',
+        },
+    },
+    {
+        'model': 'news.comment',
+        'fields': {'news': 100, 'author': ['Никто'], 'text': 'Пропуск'},
+    },
+    {'model': 'news.news', 'fields': {'title': 'Без pk', 'text': 'Текст'}},
+)
+
+
+@pytest.mark.parametrize(
+    'content',
+    (
+        '\n'.join(json.dumps(record) for record in RECORDS),
+        json.dumps(RECORDS, indent=2, ensure_ascii=False),
+    ),
+)
+def test_read_records_in_small_chunks(content):
+    assert list(read_records(StringIO(content), read_size=7)) == list(
+        RECORDS
+    )
+
+
+def test_bad_record_stops_reading():
+    content = '{"model": oops}\n' + '\n'.join(
+        json.dumps(record) for record in RECORDS * 100
+    )
+    file = StringIO(content)
+    with pytest.raises(ArchiveError):
+        list(read_records(file, read_size=64))
+    assert file.tell() == 64
+
+
+@pytest.mark.parametrize('batch_size', (1, 1000))
+def test_import_news(author, tmp_path, batch_size):
+    path = tmp_path / 'archive.jsonl'
+    path.write_text(
+        '\n'.join(json.dumps(record) for record in RECORDS), 'utf-8'
+    )
+    out = StringIO()
+    call_command(
+        'import_news', str(path), f'--batch-size={batch_size}', stdout=out
+    )
+    assert News.objects.count() == 2
+    comment = Comment.objects.get()
+    assert comment.author == author
+    assert comment.news_id == 100
+    assert comment.created.isoformat() == '2020-01-03T10:00:00+00:00'
+    assert 'пропущено (нет автора): 1' in out.getvalue()
+    news = News.objects.get(pk=100)
+    assert news.comment_count == 1
+    assert news.last_commented_at == comment.created
+
+
+def test_import_adds_to_counters(comment, news, tmp_path):
+    records = [
+        {
+            'model': 'news.comment',
+            'fields': {
+                'news': news.pk,
+                'author': 'Автор',
+                'text': text,
+                'created': created,
+                'status': status,
+            },
+        }
+        for text, created, status in (
+            ('Раньше', '2020-01-03T10:00:00+00:00', 'published'),
+            ('Позже', '2100-01-01T10:00:00+00:00', 'published'),
+            ('Ждёт', '2200-01-01T10:00:00+00:00', 'pending'),
+        )
+    ]
+    path = tmp_path / 'archive.jsonl'
+    path.write_text(
+        '\n'.join(json.dumps(record) for record in records), 'utf-8'
+    )
+    call_command(
+        'import_news', str(path), '--batch-size=2', stdout=StringIO()
+    )
+    news.refresh_from_db()
+    assert news.comment_count == 3
+    assert news.last_commented_at == Comment.objects.get(
+        text='Позже'
+    ).created
+
+
+@pytest.mark.django_db
+def test_import_bad_record(tmp_path):
+    path = tmp_path / 'archive.jsonl'
+    path.write_text('{"model": "news.news", "fields": {}}', 'utf-8')
+    with pytest.raises(CommandError):
+        call_command('import_news', str(path), stdout=StringIO())
+
+
+@pytest.mark.usefixtures('all_news', 'all_comments')
+@pytest.mark.django_db
+def test_export_round_trip(django_assert_num_queries):
+    out = StringIO()
+    with django_assert_num_queries(2):
+        call_command('export_news', '--chunk-size=3', stdout=out)
+    records = list(read_records(StringIO(out.getvalue())))
+    assert len(records) == News.objects.count() + Comment.objects.count()
+    news_pk = None
+    for record in records:
+        if record['model'] == 'news.news':
+            news_pk = record['pk']
+        else:
+            assert record['fields']['news'] == news_pk
+            assert record['fields']['author'] == 'Автор'
+
+
+@pytest.mark.django_db
+def test_export_skips_orphaned_comments(author):
+    deleted = News.objects.create(title='Удалённая', text='Текст')
+    kept = News.objects.create(title='Оставшаяся', text='Текст')
+    orphan = Comment.objects.create(news=deleted, author=author, text='1')
+    comment = Comment.objects.create(news=kept, author=author, text='2')
+    # Так новость выглядит, если её удалили после чтения комментариев.
+    News.objects.filter(pk=deleted.pk)._raw_delete(News.objects.db)
+    try:
+        records = [
+            (record['model'], record['pk']) for record in archive_records()
+        ]
+    finally:
+        Comment.objects.filter(pk=orphan.pk)._raw_delete(Comment.objects.db)
+    assert records == [('news.news', kept.pk), ('news.comment', comment.pk)]
+
+
+@pytest.mark.django_db
+def test_export_endpoint_for_staff(client, author, comment):
+    author.is_staff = True
+    author.save()
+    client.force_login(author)
+    response = client.get(EXPORT_URL, {'format': 'csv'})
+    assert response.status_code == HTTPStatus.OK
+    rows = list(csv.reader(
+        b''.join(response.streaming_content).decode().splitlines()
+    ))
+    assert rows[0] == list(CSV_COLUMNS)
+    assert [row[0] for row in rows[1:]] == ['news.news', 'news.comment']
+
+
+def test_export_endpoint_forbidden_for_readers(not_author_client):
+    response = not_author_client.get(EXPORT_URL)
+    assert response.status_code == HTTPStatus.FORBIDDEN
@@ -0,0 +1,94 @@
+import pytest
+
+from http import HTTPStatus
+from importlib import reload
+from urllib.parse import urlencode
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import clear_url_caches, reverse
+
+import news.urls
+import yanews.urls
+from news.models import Comment
+
+HOME_URL = reverse('news:home')
+
+
+def reload_urls():
+    reload(news.urls)
+    reload(yanews.urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_views(settings):
+    settings.NEWS_ASYNC_VIEWS = True
+    reload_urls()
+    yield
+    settings.NEWS_ASYNC_VIEWS = False
+    reload_urls()
+
+
+async def awaited(awaitable):
+    return await awaitable
+
+
+def async_get(url, client=None, **extra):
+    return async_to_sync(awaited)((client or AsyncClient()).get(url, **extra))
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('all_news')
+def test_home_matches_sync_view(
+    client, async_views, django_assert_num_queries
+):
+    expected = client.get(HOME_URL)
+    # Карточки уже в кеше: ни базы, ни перехода в синхронный поток.
+    with django_assert_num_queries(0):
+        response = async_get(HOME_URL)
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == expected.content
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('all_news')
+def test_home_cold_cache(async_views):
+    response = async_get(HOME_URL)
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.context['news_cards']) > 0
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('comment')
+def test_detail_matches_sync_view(client, news, async_views):
+    url = reverse('news:detail', args=(news.pk,))
+    expected = client.get(url)
+    response = async_get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == expected.content
+    assert response['ETag'] == expected['ETag']
+    assert async_get(
+        url, **{'If-None-Match': response['ETag']}
+    ).status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_detail_not_found(async_views):
+    response = async_get(reverse('news:detail', args=(404,)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_detail_for_author(author, news, form_data, async_views):
+    client = AsyncClient()
+    client.force_login(author)
+    url = reverse('news:detail', args=(news.pk,))
+    assert 'form' in async_get(url, client).context
+    # Multipart AsyncClient Django 3.2 читает больше, чем передал.
+    response = async_to_sync(awaited)(client.post(
+        url, urlencode(form_data),
+        content_type='application/x-www-form-urlencoded',
+    ))
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.get().text == form_data['text']
@@ -0,0 +1,153 @@
+import pytest
+
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from news.cache import HOME_KEY, comments_version_key, version_key
+from news.models import Comment
+
+
+HOME_URL = reverse('news:home')
+
+
+@pytest.mark.usefixtures('all_news')
+@pytest.mark.django_db
+def test_warm_home_page_makes_no_queries(client, django_assert_num_queries):
+    cold_response = client.get(HOME_URL)
+    with django_assert_num_queries(0):
+        warm_response = client.get(HOME_URL)
+    assert warm_response.status_code == HTTPStatus.OK
+    assert warm_response.content == cold_response.content
+
+
+@pytest.mark.django_db
+def test_news_edit_refreshes_only_its_card(
+    client, all_news, django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    client.get(HOME_URL)
+    edited_news = all_news[0]
+    edited_news.title = 'Новый заголовок'
+    with django_capture_on_commit_callbacks(execute=True):
+        edited_news.save()
+    with django_assert_num_queries(1):
+        response = client.get(HOME_URL)
+    assert edited_news.title in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_news_edit_invalidates_after_commit(
+    client, news, django_capture_on_commit_callbacks
+):
+    client.get(HOME_URL)
+    with django_capture_on_commit_callbacks(execute=True):
+        news.title = 'Новый заголовок'
+        news.save()
+        assert cache.get(HOME_KEY) is not None
+        assert cache.get(version_key(news.pk)) is None
+    assert cache.get(HOME_KEY) is None
+    assert cache.get(version_key(news.pk)) is not None
+
+
+def test_new_comment_refreshes_counter(
+    client, author_client, news, news_id_for_args, form_data,
+    django_capture_on_commit_callbacks,
+):
+    client.get(HOME_URL)
+    with django_capture_on_commit_callbacks(execute=True):
+        author_client.post(
+            reverse('news:detail', args=news_id_for_args), data=form_data
+        )
+    response = client.get(HOME_URL)
+    assert 'Комментариев: 1' in response.content.decode()
+
+
+def test_new_comment_invalidates_after_commit(
+    client, author, news, django_capture_on_commit_callbacks
+):
+    client.get(HOME_URL)
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(news=news, author=author, text='Новый')
+        assert cache.get(HOME_KEY) is not None
+        assert cache.get(comments_version_key(news.pk)) is None
+    assert cache.get(HOME_KEY) is None
+    assert cache.get(comments_version_key(news.pk)) is not None
+
+
+def test_deleted_comment_refreshes_counter(
+    client, comment, django_capture_on_commit_callbacks
+):
+    assert 'Комментариев: 1' in client.get(HOME_URL).content.decode()
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.get().delete()
+    assert 'Комментариев' not in client.get(HOME_URL).content.decode()
+
+
+@pytest.mark.django_db
+def test_anonymous_detail_conditional_get(
+    client, news, django_assert_num_queries
+):
+    url = reverse('news:detail', args=(news.id,))
+    response = client.get(url)
+    etag = response['ETag']
+    assert not response.has_header('Last-Modified')
+    with django_assert_num_queries(1):
+        cached_response = client.get(url)
+    assert cached_response.content == response.content
+    with django_assert_num_queries(1):
+        not_modified = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not_modified['ETag'] == etag
+
+
+@pytest.mark.django_db
+def test_unused_query_params_share_detail_cache(
+    client, news, django_assert_num_queries
+):
+    url = reverse('news:detail', args=(news.id,))
+    etag = client.get(url, {'x': 1})['ETag']
+    with django_assert_num_queries(1):
+        response = client.get(url, {'x': 2})
+    assert response['ETag'] == etag
+
+
+@pytest.mark.django_db
+def test_if_modified_since_alone_not_trusted(client, news):
+    url = reverse('news:detail', args=(news.id,))
+    response = client.get(
+        url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT'
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_new_comment_changes_etag(client, news, author):
+    url = reverse('news:detail', args=(news.id,))
+    etag = client.get(url)['ETag']
+    Comment.objects.create(news=news, author=author, text='Новый')
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+    assert 'Новый' in response.content.decode()
+
+
+def test_edited_comment_changes_etag(
+    client, comment, news, django_capture_on_commit_callbacks
+):
+    url = reverse('news:detail', args=(news.id,))
+    etag = client.get(url)['ETag']
+    comment.text = 'Исправленный'
+    with django_capture_on_commit_callbacks(execute=True):
+        comment.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert 'Исправленный' in response.content.decode()
+
+
+def test_authenticated_user_bypasses_detail_cache(author_client, news):
+    url = reverse('news:detail', args=(news.id,))
+    response = author_client.get(url)
+    assert not response.has_header('ETag')
+    assert 'form' in response.context
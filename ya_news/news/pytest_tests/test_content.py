@@ -1,11 +1,13 @@
 import pytest
 
 from django.conf import settings
+from django.db.models.signals import post_init
 from django.urls import reverse
 
 from http import HTTPStatus
 
 from news.forms import CommentForm
+from news.models import Comment
 
 
 HOME_URL = reverse('news:home')
@@ -61,3 +63,64 @@ def test_comments_order(client, all_comments, news):
         key=lambda comment: comment.created,
     )
     assert list(all_comments) == sorted_comments
+
+
+@pytest.mark.parametrize(
+    'comments',
+    (pytest.lazy_fixture('comment'), pytest.lazy_fixture('many_comments')),
+)
+@pytest.mark.django_db
+def test_home_page_doesnt_load_comments(
+    client, comments, news, django_assert_num_queries
+):
+    loaded_comments = []
+
+    def count_loaded(sender, instance, **kwargs):
+        loaded_comments.append(instance)
+
+    post_init.connect(count_loaded, sender=Comment)
+    try:
+        with django_assert_num_queries(1):
+            response = client.get(HOME_URL)
+    finally:
+        post_init.disconnect(count_loaded, sender=Comment)
+    assert response.status_code == HTTPStatus.OK
+    assert loaded_comments == []
+    news_on_home_page = response.context['object_list']
+    assert news_on_home_page[0].comment_count == news.comment_set.count()
+
+
+@pytest.mark.django_db
+def test_comments_keyset_pages(
+    client, many_comments, news, django_assert_num_queries
+):
+    detail_url = reverse('news:detail', args=(news.id,))
+    page_size = settings.COMMENTS_COUNT_ON_DETAIL_PAGE
+    expected_ids = list(
+        news.comment_set.order_by('created', 'id').values_list(
+            'id', flat=True
+        )
+    )
+    shown_ids = []
+    data = {}
+    while True:
+        with django_assert_num_queries(3):
+            response = client.get(detail_url, data=data)
+        assert response.status_code == HTTPStatus.OK
+        comments = response.context['comments']
+        assert len(comments) <= page_size
+        shown_ids += [comment.id for comment in comments]
+        if response.context['next_cursor'] is None:
+            break
+        data = {'after': response.context['next_cursor']}
+    assert shown_ids == expected_ids
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'cursor', ('bad', '0-99999999999999999999999', '9' * 23 + '-1')
+)
+def test_bad_comments_cursor(client, news, cursor):
+    detail_url = reverse('news:detail', args=(news.id,))
+    response = client.get(detail_url, data={'after': cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,45 @@
+import pytest
+
+from types import SimpleNamespace
+
+from django.conf import settings
+
+from news.models import Comment
+from news.pagination import after_cursor, encode_cursor
+from news.views import CommentUpdate, NewsList
+
+
+def assert_uses_index(queryset, index_name):
+    plan = queryset.explain()
+    assert f'INDEX {index_name}' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+@pytest.mark.django_db
+def test_home_page_uses_date_index():
+    assert_uses_index(NewsList().get_queryset(), 'news_date_id_idx')
+
+
+@pytest.mark.parametrize('with_cursor', (False, True))
+@pytest.mark.django_db
+def test_comments_page_uses_news_index(news, comment, with_cursor):
+    cursor = encode_cursor(comment) if with_cursor else None
+    queryset = after_cursor(
+        news.comment_set.published().select_related('author'), cursor
+    )[:settings.COMMENTS_COUNT_ON_DETAIL_PAGE + 1]
+    assert_uses_index(queryset, 'comment_news_created_idx')
+
+
+@pytest.mark.django_db
+def test_author_comments_use_author_index(author):
+    view = CommentUpdate()
+    view.request = SimpleNamespace(user=author)
+    assert_uses_index(view.get_queryset(), 'comment_author_created_idx')
+
+
+@pytest.mark.django_db
+def test_moderation_queue_uses_pending_index():
+    queryset = Comment.objects.filter(
+        status=Comment.Status.PENDING
+    ).order_by('pk')[:500]
+    assert_uses_index(queryset, 'comment_pending_idx')
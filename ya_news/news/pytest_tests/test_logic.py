@@ -1,12 +1,15 @@
 import pytest
 
 from http import HTTPStatus
+from io import StringIO
 
+from django.core.management import call_command
 from django.urls import reverse
 from pytest_django.asserts import assertFormError, assertRedirects
 
 from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.models import Comment, News
+from news.moderation import get_matcher
 
 import random
 
@@ -122,3 +125,55 @@ def anonymous_cant_edit_comment_of_another_user(client, comment):
     assert response.status_code == HTTPStatus.NOT_FOUND
     comment.refresh_from_db()
     assert comment.text == COMMENT_TEXT
+
+
+def test_comment_post_query_budget(
+    author_client, news_id_for_args, form_data, django_assert_num_queries
+):
+    url = reverse('news:detail', args=news_id_for_args)
+    # Список запрещённых слов процесс загружает один раз.
+    get_matcher()
+    # Сессия и пользователь, одна выборка новости, вставка, обновление
+    # счётчика и строка поискового индекса; внутри тестовой транзакции
+    # atomic() даёт ещё SAVEPOINT и RELEASE.
+    with django_assert_num_queries(8) as captured:
+        response = author_client.post(url, data=form_data)
+    assert response.status_code == HTTPStatus.FOUND
+    queries = [query['sql'] for query in captured.captured_queries]
+    assert sum('FROM "news_news"' in sql for sql in queries) == 1
+    assert sum(sql.startswith('INSERT INTO "news_') for sql in queries) == 1
+    assert sum(sql.startswith('UPDATE') for sql in queries) == 1
+
+
+def test_comment_counters(author_client, comment, news, news_id_for_args):
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    assert news.last_commented_at == comment.created
+    url = reverse('news:detail', args=news_id_for_args)
+    author_client.post(url, data={'text': COMMENT_TEXT})
+    new_comment = Comment.objects.latest('created')
+    news.refresh_from_db()
+    assert news.comment_count == 2
+    assert news.last_commented_at == new_comment.created
+    author_client.post(reverse('news:delete', args=(new_comment.id,)))
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    assert news.last_commented_at == comment.created
+
+
+def test_status_change_updates_counters(comment, news):
+    comment = Comment.objects.get(pk=comment.pk)
+    comment.status = Comment.Status.REJECTED
+    comment.save()
+    news.refresh_from_db()
+    assert news.comment_count == 0
+    assert news.last_commented_at is None
+
+
+def test_reconcile_counters(comment, news, all_news):
+    News.objects.update(comment_count=5)
+    out = StringIO()
+    call_command('reconcile_counters', '--batch-size=2', stdout=out)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    assert 'исправлено: ' + str(News.objects.count()) in out.getvalue()
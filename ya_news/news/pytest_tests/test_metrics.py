@@ -0,0 +1,111 @@
+import pytest
+
+import logging
+from http import HTTPStatus
+
+from django.urls import reverse
+
+from yaperf.metrics import Histogram, prometheus_text, registry
+
+HOME_URL = reverse('news:home')
+METRICS_URL = reverse('metrics')
+
+
+@pytest.fixture
+def metrics_enabled(settings):
+    settings.PERF_METRICS_ENABLED = True
+    registry.clear()
+    yield
+    registry.clear()
+
+
+def test_histogram_buckets_and_quantile():
+    histogram = Histogram((1, 5, 10))
+    for value in (0, 1, 2, 7, 100):
+        histogram.observe(value)
+    assert list(histogram.cumulative()) == [
+        (1, 2), (5, 3), (10, 4), (float('inf'), 5)
+    ]
+    assert histogram.quantile(0.5) == 5
+    assert histogram.sum == 110
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('metrics_enabled')
+def test_request_metrics_by_view_name(client, news):
+    client.get(HOME_URL)
+    client.get(reverse('news:detail', args=(news.pk,)))
+    client.get(reverse('news:detail', args=(news.pk,)))
+    requests = registry.get('request_seconds', 'news:detail')
+    assert requests.count == 2
+    queries = registry.get('sql_queries', 'news:home')
+    assert queries.count == 1 and queries.sum >= 1
+    assert registry.get('template_seconds', 'news:home').sum > 0
+    size = registry.get('response_bytes', 'news:home')
+    assert size.sum == len(client.get(HOME_URL).content)
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('metrics_enabled')
+def test_unresolved_url(client):
+    client.get('/no-such-page/')
+    assert registry.get('request_seconds', '<unresolved>').count == 1
+
+
+@pytest.mark.django_db
+def test_disabled_by_default(client):
+    registry.clear()
+    client.get(HOME_URL)
+    assert registry.views() == []
+    assert client.get(METRICS_URL).status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('metrics_enabled')
+def test_scrape_endpoint(client, admin_client):
+    client.get(HOME_URL)
+    # Локальный адрес доступа не даёт: так выглядит прокси.
+    assert client.get(
+        METRICS_URL, REMOTE_ADDR='127.0.0.1'
+    ).status_code == HTTPStatus.NOT_FOUND
+    response = admin_client.get(METRICS_URL)
+    assert response.status_code == HTTPStatus.OK
+    text = response.content.decode()
+    assert 'yaperf_request_seconds_count{view="news:home"} 1' in text
+    assert '# TYPE yaperf_sql_queries histogram' in text
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('metrics_enabled')
+@pytest.mark.parametrize(
+    'token, header, status',
+    (
+        ('sekret', 'Bearer sekret', HTTPStatus.OK),
+        ('sekret', 'Bearer chuzhoj', HTTPStatus.NOT_FOUND),
+        ('sekret', 'sekret', HTTPStatus.NOT_FOUND),
+        ('', 'Bearer ', HTTPStatus.NOT_FOUND),
+    ),
+)
+def test_scrape_token(client, settings, token, header, status):
+    settings.PERF_METRICS_TOKEN = token
+    response = client.get(METRICS_URL, HTTP_AUTHORIZATION=header)
+    assert response.status_code == status
+
+
+def test_prometheus_label_escaping():
+    registry.clear()
+    registry.observe('a"b', {'sql_queries': 1})
+    assert 'view="a\\"b"' in prometheus_text(registry)
+    registry.clear()
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('metrics_enabled')
+def test_periodic_log_line(client, settings, caplog):
+    settings.PERF_METRICS_LOG_INTERVAL = 1e-9
+    with caplog.at_level(logging.INFO, logger='yaperf'):
+        client.get(HOME_URL)
+    assert any(
+        'view=news:home requests=1' in message
+        for message in caplog.messages
+    )
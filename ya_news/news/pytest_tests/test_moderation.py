@@ -0,0 +1,136 @@
+import pytest
+
+import random
+
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+
+from news.forms import BAD_WORDS, WARNING, CommentForm
+from news.management.commands.moderate_comments import Command
+from news.models import BadWord, Comment
+from news.moderation import (
+    VERSION_KEY, WordMatcher, get_matcher, load_bad_words
+)
+
+
+def naive_find(words, text):
+    return any(word in text for word in words)
+
+
+@pytest.mark.parametrize(
+    'words, text',
+    (
+        (('he', 'she', 'his', 'hers'), 'ushers'),
+        (('abcd', 'bc'), 'abce'),
+        (('aab',), 'aaab'),
+        (('a', 'ab'), 'xyz'),
+        (('',), 'любой текст'),
+        ((), 'любой текст'),
+        (BAD_WORDS, 'ты редиска!'),
+    ),
+)
+def test_matcher_matches_substring_semantics(words, text):
+    matcher = WordMatcher(words)
+    assert (matcher.find(text) is not None) == naive_find(words, text)
+
+
+def test_matcher_on_random_words():
+    generator = random.Random(42)
+    alphabet = 'абвг'
+    for _ in range(200):
+        words = [
+            ''.join(generator.choices(alphabet, k=generator.randint(1, 5)))
+            for _ in range(generator.randint(1, 20))
+        ]
+        text = ''.join(generator.choices(alphabet, k=30))
+        found = WordMatcher(words).find(text)
+        assert (found is not None) == naive_find(words, text)
+        assert found is None or found in text
+
+
+def test_bad_words_from_file(settings, tmp_path):
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# Комментарий\nгад\n\n  злодей \n', 'utf-8')
+    settings.BAD_WORDS_FILE = words_file
+    assert load_bad_words() == ('гад', 'злодей')
+
+
+@pytest.mark.django_db
+def test_form_rejects_bad_word_in_any_case():
+    form = CommentForm(data={'text': f'Вы {BAD_WORDS[0].upper()}!'})
+    assert not form.is_valid()
+    assert form.errors['text'] == [WARNING]
+
+
+@pytest.mark.django_db
+def test_bad_word_from_database(django_capture_on_commit_callbacks):
+    form_data = {'text': 'Вы Злодей!'}
+    assert CommentForm(data=form_data).is_valid()
+    with django_capture_on_commit_callbacks(execute=True):
+        BadWord.objects.create(word='ЗЛОДЕЙ')
+    assert not CommentForm(data=form_data).is_valid()
+
+
+@pytest.mark.django_db
+def test_other_process_reloads_bad_words(settings):
+    settings.MODERATION_CHECK_INTERVAL = 0
+    assert get_matcher().find('злодей') is None
+    BadWord.objects.create(word='злодей')
+    assert get_matcher().find('злодей') is None
+    # Так метку версии меняет другой процесс.
+    cache.set(VERSION_KEY, 'другая версия')
+    assert get_matcher().find('злодей') == 'злодей'
+
+
+@pytest.mark.parametrize('workers', (0, 2))
+def test_async_moderation(
+    settings, author_client, client, news, news_id_for_args, workers
+):
+    settings.COMMENTS_MODERATION_ASYNC = True
+    url = reverse('news:detail', args=news_id_for_args)
+    texts = ('Хорошая новость', f'Вы {BAD_WORDS[0]}!')
+    for text in texts:
+        response = author_client.post(url, data={'text': text})
+        assert response.status_code == HTTPStatus.FOUND
+    assert set(Comment.objects.values_list('status', flat=True)) == {
+        Comment.Status.PENDING
+    }
+    assert client.get(url).context['comments'] == []
+    call_command(
+        'moderate_comments', '--once', f'--workers={workers}',
+        stdout=StringIO(),
+    )
+    assert dict(Comment.objects.values_list('text', 'status')) == {
+        texts[0]: Comment.Status.PUBLISHED,
+        texts[1]: Comment.Status.REJECTED,
+    }
+    comments = client.get(url).context['comments']
+    assert [comment.text for comment in comments] == [texts[0]]
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    assert news.last_commented_at == comments[0].created
+
+
+def test_comment_edited_during_check_is_checked_again(author, news):
+    comment = Comment.objects.create(
+        news=news, author=author, text='Хорошая новость',
+        status=Comment.Status.PENDING,
+    )
+    verdicts = Command.verdicts
+    edited = f'Вы {BAD_WORDS[0]}!'
+
+    def edit_while_checking(self, workers, texts):
+        Comment.objects.filter(pk=comment.pk).update(text=edited)
+        return verdicts(self, workers, texts)
+
+    with mock.patch.object(Command, 'verdicts', edit_while_checking):
+        call_command(
+            'moderate_comments', '--once', '--workers=0', stdout=StringIO()
+        )
+    comment.refresh_from_db()
+    assert comment.status == Comment.Status.REJECTED
@@ -0,0 +1,114 @@
+import pytest
+
+import logging
+from http import HTTPStatus
+
+from django.db import connection
+from django.http import HttpResponse
+from django.template import engines
+from django.test import RequestFactory
+from django.urls import reverse
+
+from news.models import Comment
+from yaperf.middleware import NPlusOneMiddleware, dispatch, install_all
+from yaperf.nplusone import NPlusOneError, QueryShapes, fingerprint
+from yaperf.sqlite.base import DatabaseWrapper
+
+COMMENTS = 8
+
+
+@pytest.fixture
+def comments(author, news):
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(COMMENTS)
+    )
+
+
+def call(view):
+    """Представление за middleware, как его вызвал бы Django."""
+    return NPlusOneMiddleware(view)(RequestFactory().get('/'))
+
+
+def authors_view(request):
+    return HttpResponse(', '.join(
+        comment.author.username for comment in Comment.objects.all()
+    ))
+
+
+def test_fingerprint_ignores_values():
+    assert fingerprint(
+        'SELECT * FROM t WHERE id IN (%s, %s) AND name = \'a\' LIMIT 21'
+    ) == fingerprint(
+        'SELECT * FROM t WHERE id IN (%s) AND name = \'b\' LIMIT 1'
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('comments')
+def test_repeated_queries_name_code_line():
+    with pytest.raises(NPlusOneError) as error:
+        call(authors_view)
+    message = str(error.value)
+    assert f'{COMMENTS} × SELECT' in message
+    assert 'auth_user' in message
+    line = authors_view.__code__.co_firstlineno + 2
+    assert f'news/pytest_tests/test_nplusone.py:{line}' in message
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('comments')
+def test_repeated_queries_name_template_line():
+    template = engines['django'].from_string(
+        '{% for comment in comments %}\n'
+        '{{ comment.author }}\n'
+        '{% endfor %}'
+    )
+
+    def view(request):
+        return HttpResponse(
+            template.render({'comments': Comment.objects.all()})
+        )
+
+    with pytest.raises(NPlusOneError, match='<unknown source>:2'):
+        call(view)
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('comments')
+def test_production_only_logs(settings, caplog):
+    settings.NPLUSONE_RAISE = False
+    with caplog.at_level(logging.WARNING, logger='yaperf'):
+        response = call(authors_view)
+    assert response.status_code == HTTPStatus.OK
+    assert 'N+1 в GET /' in caplog.text
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('comments')
+def test_below_threshold(settings):
+    settings.NPLUSONE_THRESHOLD = COMMENTS
+    assert call(authors_view).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('all_news', 'comments')
+def test_pages_have_no_repeated_queries(client, news):
+    # При N+1 запрос уронит NPLUSONE_RAISE из settings_test.
+    assert client.get(reverse('news:home')).status_code == HTTPStatus.OK
+    response = client.get(reverse('news:detail', args=(news.pk,)))
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_dispatch_installed_inside_execute_wrapper():
+    install_all()
+    wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': ':memory:'})
+    try:
+        # Соединение открывается внутри execute_wrapper(): при выходе
+        # он должен снять свою обёртку, а не dispatch.
+        with wrapper.execute_wrapper(QueryShapes()):
+            wrapper.ensure_connection()
+        assert wrapper.execute_wrappers == [dispatch]
+    finally:
+        wrapper.close()
@@ -0,0 +1,140 @@
+import pytest
+
+import shutil
+import sqlite3
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from news.models import Comment, News
+from news.replicas import PIN_COOKIE, ReplicaRouter, Routing, routing
+from yaperf.sqlite.base import DatabaseWrapper
+
+REPLICA = 'replica'
+HOME_URL = reverse('news:home')
+
+pytestmark = pytest.mark.django_db(databases=[DEFAULT_DB_ALIAS, REPLICA])
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.NEWS_REPLICAS = [REPLICA]
+
+
+@pytest.fixture
+def detail_url(news):
+    return reverse('news:detail', args=(news.pk,))
+
+
+@pytest.fixture(scope='session')
+def replica_snapshot(users, django_db_blocker, tmp_path_factory):
+    """
+    Тестовая база в файле до начала тестов: схема и пользователи.
+
+    Копировать её внутри теста нельзя: backup API ждёт окончания
+    транзакции, в которой идёт тест.
+    """
+    path = tmp_path_factory.mktemp('replica') / 'replica.sqlite3'
+    with django_db_blocker.unblock():
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.close()
+    return path
+
+
+@pytest.fixture
+def lagging_replica(replicas, replica_snapshot, tmp_path):
+    """
+    Реплика — отдельный файл SQLite. Репликацию заменяет replicated():
+    пока строку не скопировали, реплика её не видит.
+    """
+    path = tmp_path / 'replica.sqlite3'
+    shutil.copy(replica_snapshot, path)
+    original = connections[REPLICA]
+    replica = DatabaseWrapper(
+        {**original.settings_dict, 'NAME': str(path)}, REPLICA
+    )
+    connections[REPLICA] = replica
+    yield
+    replica.close()
+    connections[REPLICA] = original
+
+
+def replicated(*objects):
+    """Копия строк на реплику без сигналов, как при репликации."""
+    for obj in objects:
+        type(obj).objects.using(REPLICA).bulk_create([obj])
+
+
+def replica_queries(client, url):
+    with CaptureQueriesContext(connections[REPLICA]) as queries:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return len(queries)
+
+
+@pytest.mark.usefixtures('replicas', 'all_news')
+def test_news_pages_read_from_replica(client, detail_url):
+    # Главная читает базу, только заполняя кеш, а это основная база.
+    assert replica_queries(client, HOME_URL) == 0
+    assert replica_queries(client, detail_url) > 0
+
+
+@pytest.mark.usefixtures('lagging_replica')
+def test_home_cache_not_filled_from_lagging_replica(client, news):
+    assert not News.objects.using(REPLICA).exists()
+    assert news.title in client.get(HOME_URL).content.decode()
+
+
+@pytest.mark.usefixtures('lagging_replica')
+def test_detail_cache_not_filled_from_lagging_replica(
+    client, news, comment, detail_url
+):
+    replicated(news, comment)
+    comment.text = 'Исправленный комментарий'
+    comment.save()
+    assert Comment.objects.using(REPLICA).get().text != comment.text
+    assert comment.text in client.get(detail_url).content.decode()
+
+
+@pytest.mark.usefixtures('news')
+def test_without_replicas_reads_primary(client, detail_url):
+    assert replica_queries(client, detail_url) == 0
+
+
+@pytest.mark.usefixtures('replicas')
+def test_own_write_pins_to_primary(
+    settings, author_client, detail_url, form_data
+):
+    response = author_client.post(detail_url, data=form_data)
+    assert response.status_code == HTTPStatus.FOUND
+    cookie = response.cookies[PIN_COOKIE]
+    assert cookie['max-age'] == settings.NEWS_REPLICA_PIN_SECONDS
+    assert replica_queries(author_client, detail_url) == 0
+
+
+def test_router_sends_only_news_reads_to_replica(settings):
+    settings.NEWS_REPLICAS = [REPLICA]
+    router = ReplicaRouter()
+    assert router.db_for_read(News) is None
+    state = Routing(pinned=False)
+    state.replica = True
+    token = routing.set(state)
+    try:
+        assert router.db_for_read(News) == REPLICA
+        assert router.db_for_read(get_user_model()) is None
+        assert router.db_for_write(News) == DEFAULT_DB_ALIAS
+    finally:
+        routing.reset(token)
+    assert state.wrote
+    assert router.allow_migrate(REPLICA, 'news') is False
+
+
+def test_replicate_without_replicas():
+    with pytest.raises(CommandError):
+        call_command('replicate')
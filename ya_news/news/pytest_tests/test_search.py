@@ -0,0 +1,178 @@
+import pytest
+
+import json
+from datetime import date, timedelta
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.http import QueryDict
+from django.urls import reverse
+
+from news.models import Comment, News
+from news.search import get_backend
+
+SEARCH_URL = reverse('news:search')
+
+
+def found(client, **params):
+    response = client.get(SEARCH_URL, data=params)
+    assert response.status_code == HTTPStatus.OK
+    return response
+
+
+def found_ids(client, **params):
+    return [news.pk for news, _, _ in found(client, **params).context[
+        'results'
+    ]]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'query',
+    ('заголовок', 'ТЕКСТ заметки', 'комментар', 'текст комментария'),
+)
+def test_search_news_and_comments(client, news, comment, query):
+    assert found_ids(client, q=query) == [news.pk]
+
+
+@pytest.mark.django_db
+def test_search_without_match(client, news):
+    response = found(client, q='отсутствует')
+    assert response.context['results'] == []
+    assert 'Ничего не найдено.' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_search_folds_yo(client):
+    news = News.objects.create(title='Ёлка', text='Зелёная ёлочка.')
+    assert found_ids(client, q='елка') == [news.pk]
+    assert found_ids(client, q='зелёная') == [news.pk]
+
+
+@pytest.mark.django_db
+def test_snippet_is_highlighted_and_escaped(client):
+    News.objects.create(title='Новость', text='<b>Важное</b> событие дня')
+    news, title, snippet = found(client, q='событие').context['results'][0]
+    assert title == 'Новость'
+    assert snippet == '&lt;b&gt;Важное&lt;/b&gt; <mark>событие</mark> дня'
+
+
+@pytest.mark.django_db
+def test_snippet_from_comment(client, news, comment):
+    news, title, snippet = found(client, q='комментария').context[
+        'results'
+    ][0]
+    assert title is None
+    assert snippet == 'Текст <mark>комментария</mark>'
+
+
+@pytest.mark.django_db
+def test_search_by_date(client):
+    today = date.today()
+    all_news = [
+        News.objects.create(
+            title=f'Новость {index}', text='Событие',
+            date=today - timedelta(days=index),
+        )
+        for index in range(5)
+    ]
+    assert found_ids(
+        client, q='событие',
+        date_from=today - timedelta(days=3),
+        date_to=today - timedelta(days=1),
+    ) == [news.pk for news in all_news[1:4]]
+
+
+@pytest.mark.django_db
+def test_search_pages(client, settings, django_assert_num_queries):
+    settings.NEWS_SEARCH_RESULTS = 4
+    today = date.today()
+    for index in range(10):
+        News.objects.create(
+            title=f'Новость {index}', text='Событие',
+            date=today - timedelta(days=index // 3),
+        )
+    expected = list(
+        News.objects.order_by('-date', '-pk').values_list('pk', flat=True)
+    )
+    seen, params = [], {'q': 'событие'}
+    while True:
+        # Страница новостей и фрагменты для неё.
+        with django_assert_num_queries(2):
+            response = found(client, **params)
+        seen += [news.pk for news, _, _ in response.context['results']]
+        if 'next_query' not in response.context:
+            break
+        params = QueryDict(response.context['next_query']).dict()
+    assert seen == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cursor', ('x', '1-99999999999999999999999'))
+def test_search_bad_cursor(client, news, cursor):
+    response = client.get(SEARCH_URL, data={'q': 'текст', 'after': cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_index_follows_comment_changes(client, news, comment):
+    comment.status = Comment.Status.PENDING
+    comment.save()
+    assert found_ids(client, q='комментария') == []
+    comment.status = Comment.Status.PUBLISHED
+    comment.save()
+    assert found_ids(client, q='комментария') == [news.pk]
+    comment.delete()
+    assert found_ids(client, q='комментария') == []
+
+
+@pytest.mark.django_db
+def test_index_forgets_deleted_news(client, news, comment):
+    news.delete()
+    assert found_ids(client, q='заголовок') == []
+    assert found_ids(client, q='комментария') == []
+
+
+@pytest.mark.django_db
+def test_rebuild_search_index(client, news, comment):
+    get_backend().clear()
+    assert found_ids(client, q='комментария') == []
+    out = StringIO()
+    call_command('rebuild_news_search', '--batch-size=1', stdout=out)
+    assert found_ids(client, q='комментария') == [news.pk]
+    assert 'новостей: 1, комментариев: 1' in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_import_indexes_rows(client, author, tmp_path):
+    path = tmp_path / 'archive.jsonl'
+    path.write_text('\n'.join(json.dumps(record) for record in (
+        {'model': 'news.news', 'pk': 7, 'fields': {
+            'title': 'Архив', 'text': 'Старая новость',
+        }},
+        {'model': 'news.news', 'fields': {
+            'title': 'Без id', 'text': 'Безымянная',
+        }},
+        {'model': 'news.comment', 'fields': {
+            'news': 7, 'author': 'Автор', 'text': 'Архивный отзыв',
+        }},
+    )), 'utf-8')
+    call_command('import_news', str(path), stdout=StringIO())
+    assert found_ids(client, q='отзыв') == [7]
+    assert found_ids(client, q='безымянная') == [
+        News.objects.get(title='Без id').pk
+    ]
+
+
+@pytest.mark.django_db
+def test_moderation_indexes_published(client, news, author, settings):
+    settings.COMMENTS_MODERATION_ASYNC = True
+    Comment.objects.create(
+        news=news, author=author, text='Отложенный отзыв',
+        status=Comment.Status.PENDING,
+    )
+    assert found_ids(client, q='отзыв') == []
+    call_command('moderate_comments', '--once', '--workers=0',
+                 stdout=StringIO())
+    assert found_ids(client, q='отзыв') == [news.pk]
@@ -0,0 +1,55 @@
+import pytest
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from yaperf.sqlite.base import PRAGMAS, DatabaseWrapper
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'name, expected',
+    (
+        # NORMAL
+        ('synchronous', 1),
+        ('busy_timeout', PRAGMAS['busy_timeout']),
+        ('cache_size', PRAGMAS['cache_size']),
+    ),
+)
+def test_pragmas_on_connection(name, expected):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        assert cursor.fetchone()[0] == expected
+
+
+@pytest.fixture
+def standalone():
+    """Отдельное соединение: транзакции тестов его не оборачивают."""
+    wrappers = []
+
+    def make(**options):
+        wrapper = DatabaseWrapper({
+            **connection.settings_dict, 'NAME': ':memory:', 'OPTIONS': options
+        })
+        wrappers.append(wrapper)
+        return wrapper
+
+    yield make
+    for wrapper in wrappers:
+        wrapper.close()
+
+
+@pytest.mark.django_db
+def test_transaction_takes_write_lock(standalone):
+    wrapper = standalone()
+    with CaptureQueriesContext(wrapper) as queries:
+        wrapper._start_transaction_under_autocommit()
+    assert queries[0]['sql'] == 'BEGIN IMMEDIATE'
+    assert wrapper.connection.in_transaction
+
+
+@pytest.mark.django_db
+def test_unknown_transaction_mode(standalone):
+    with pytest.raises(ImproperlyConfigured):
+        standalone(transaction_mode='LATER').ensure_connection()
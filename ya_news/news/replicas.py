@@ -0,0 +1,146 @@
+"""
+Чтение страниц новостей с реплик, запись — в основную базу.
+
+Псевдонимы реплик перечислены в NEWS_REPLICAS. На реплику уходят только
+чтения моделей news в представлениях, обёрнутых reads_from_replica;
+сессии, пользователи и админка читают основную базу. После своей записи
+пользователь NEWS_REPLICA_PIN_SECONDS секунд читает только основную
+базу: об этом помнит cookie, чтобы решение не стоило запроса к базе.
+Общий кеш страниц заполняется только по основной базе: primary_reads.
+"""
+import asyncio
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from yaperf.middleware import HybridMiddleware
+
+PIN_COOKIE = 'news_primary'
+SAFE_METHODS = ('GET', 'HEAD')
+routing = ContextVar('news_routing', default=None)
+
+
+class Routing:
+    """Решения о базе для одного запроса."""
+
+    __slots__ = ('pinned', 'replica', 'wrote')
+
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.replica = False
+        self.wrote = False
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = routing.get()
+        if (
+            state is None or not state.replica
+            or model._meta.app_label != 'news'
+        ):
+            return None
+        return random.choice(settings.NEWS_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state = routing.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_migrate(self, db, app_label, **hints):
+        """Схему реплика получает вместе с данными при репликации."""
+        return db not in settings.NEWS_REPLICAS
+
+
+def reads_from_replica(view):
+    """
+    Чтения моделей news до конца запроса идут на реплику.
+
+    Флаг не сбрасывается после view: TemplateResponse отрисовывается
+    позже, и ленивые QuerySet в шаблоне тоже должны читать реплику.
+    """
+    def use_replica(request):
+        state = routing.get()
+        if (
+            state is not None and not state.pinned
+            and request.method in SAFE_METHODS
+        ):
+            state.replica = True
+
+    if asyncio.iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            use_replica(request)
+            return await view(request, *args, **kwargs)
+    else:
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            use_replica(request)
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def primary_reads():
+    """
+    Чтения внутри блока идут в основную базу, даже в view с реплики.
+
+    По ним заполняется общий кеш: страница, собранная на отставшей
+    реплике, пережила бы репликацию и отдавалась бы до конца срока.
+    """
+    state = routing.get()
+    if state is None or not state.replica:
+        yield
+        return
+    state.replica = False
+    try:
+        yield
+    finally:
+        state.replica = True
+
+
+class ReplicaMiddleware(HybridMiddleware):
+    """
+    Состояние маршрутизации на запрос и cookie после записи.
+
+    Без NEWS_REPLICAS Django убирает middleware из цепочки.
+    """
+
+    def __init__(self, get_response):
+        if not settings.NEWS_REPLICAS:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.pin_seconds = settings.NEWS_REPLICA_PIN_SECONDS
+
+    def start(self, request):
+        state = Routing(PIN_COOKIE in request.COOKIES)
+        return state, routing.set(state)
+
+    def stop(self, state):
+        routing.reset(state[1])
+
+    def finish(self, request, response, state):
+        if state[0].wrote:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=self.pin_seconds,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+def replicate(source=DEFAULT_DB_ALIAS, targets=None):
+    """
+    Замена репликации для локального запуска: копия основной базы
+    SQLite в каждую реплику через backup API.
+    """
+    connections[source].ensure_connection()
+    for alias in targets or settings.NEWS_REPLICAS:
+        target = connections[alias]
+        target.ensure_connection()
+        connections[source].connection.backup(target.connection)
@@ -0,0 +1,190 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+from .models import Comment
+
+WORD = re.compile(r'[^\W_]+')
+FTS_TABLE = 'news_search'
+# Границы подсветки — управляющие символы, которых нет в тексте,
+# поэтому фрагмент можно экранировать целиком и только потом разметить.
+MARK_START, MARK_END = '\x02', '\x03'
+YO = str.maketrans('ёЁ', 'еЕ')
+
+
+def fold(text):
+    """В индексе и в запросе «ё» не отличается от «е»."""
+    return text.translate(YO)
+
+
+def mark(fragment):
+    return mark_safe(
+        escape(fragment)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+class SearchBackend:
+    """
+    Интерфейс поискового индекса новостей.
+
+    Документы индекса — новости (заголовок и текст) и опубликованные
+    комментарии; новость находится, если всем словам запроса отвечает
+    она сама или один из её комментариев.
+    """
+
+    def index_news(self, news_list):
+        raise NotImplementedError
+
+    def index_comments(self, comments):
+        """Неопубликованные комментарии убираются из индекса."""
+        raise NotImplementedError
+
+    def remove_news(self, pk):
+        """Убирает новость вместе с её комментариями."""
+        raise NotImplementedError
+
+    def remove_comment(self, pk):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def filter(self, queryset, terms):
+        """Новости queryset, подходящие под запрос."""
+        raise NotImplementedError
+
+    def snippets(self, news_ids, terms):
+        """Словарь id новости -> (заголовок, фрагмент) с подсветкой."""
+        raise NotImplementedError
+
+
+class Fts5Backend(SearchBackend):
+    """
+    Таблица SQLite FTS5 с документом на новость и на комментарий.
+
+    rowid новости — 2 * id, комментария — 2 * id + 1, поэтому правка
+    комментария меняет одну строку индекса. Колонка news хранит
+    «n<id новости>»: по ней удаляются комментарии удалённой новости.
+    """
+
+    COLUMNS = '{title body}'
+
+    def _replace(self, rows):
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {FTS_TABLE} '
+                '(rowid, news, title, body) VALUES (%s, %s, %s, %s)',
+                rows,
+            )
+
+    def _delete(self, rowids):
+        if not rowids:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(rowid,) for rowid in rowids],
+            )
+
+    def index_news(self, news_list):
+        self._replace([
+            (2 * news.pk, f'n{news.pk}', fold(news.title), fold(news.text))
+            for news in news_list
+        ])
+
+    def index_comments(self, comments):
+        published, hidden = [], []
+        for comment in comments:
+            if comment.status == Comment.Status.PUBLISHED:
+                published.append(comment)
+            else:
+                hidden.append(2 * comment.pk + 1)
+        self._replace([
+            (
+                2 * comment.pk + 1, f'n{comment.news_id}', '',
+                fold(comment.text),
+            )
+            for comment in published
+        ])
+        self._delete(hidden)
+
+    def remove_news(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN ('
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)',
+                [f'news:n{pk}'],
+            )
+
+    def remove_comment(self, pk):
+        self._delete([2 * pk + 1])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def match(self, terms):
+        return '{}: ({})'.format(
+            self.COLUMNS, ' AND '.join(f'"{term}"*' for term in terms)
+        )
+
+    def filter(self, queryset, terms):
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT CAST(substr(news, 2) AS INTEGER) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s',
+            [self.match(terms)],
+        ))
+
+    def snippets(self, news_ids, terms):
+        """
+        Фрагменты только для новостей страницы.
+
+        Предпочтение у строки самой новости, затем у комментария
+        с меньшим id.
+        """
+        if not news_ids:
+            return {}
+        match = '(news: {}) AND {}'.format(
+            ' OR '.join(f'n{pk}' for pk in news_ids), self.match(terms)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT CAST(substr(news, 2) AS INTEGER), rowid, '
+                f'highlight({FTS_TABLE}, 1, %s, %s), '
+                f'snippet({FTS_TABLE}, 2, %s, %s, %s, %s) '
+                f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                'ORDER BY rowid',
+                [
+                    MARK_START, MARK_END, MARK_START, MARK_END, '…',
+                    settings.NEWS_SEARCH_SNIPPET_WORDS, match,
+                ],
+            )
+            rows = cursor.fetchall()
+        snippets = {}
+        for news_id, rowid, title, body in rows:
+            if rowid % 2 == 0:
+                snippets[news_id] = (mark(title), mark(body))
+            else:
+                snippets.setdefault(news_id, (None, mark(body)))
+        return snippets
+
+
+def get_backend():
+    """Класс движка задаётся настройкой NEWS_SEARCH_BACKEND."""
+    return import_string(settings.NEWS_SEARCH_BACKEND)()
+
+
+def parse_query(query):
+    """Слова запроса без повторов, в нижнем регистре."""
+    return list(dict.fromkeys(
+        fold(word.lower()) for word in WORD.findall(query)
+    ))
@@ -0,0 +1,70 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import counters
+from .cache import bump_version, comments_changed
+from .models import BadWord, Comment, News
+from .moderation import moderation_list
+from .search import get_backend
+
+
+@receiver(pre_delete, sender=News)
+def news_deleting(sender, instance, **kwargs):
+    counters.deleting_news.set(
+        counters.deleting_news.get() | {instance.pk}
+    )
+
+
+@receiver((post_save, post_delete), sender=News)
+def news_changed(sender, instance, **kwargs):
+    """
+    Кеш сбрасывается после коммита: иначе читатель успел бы собрать
+    его заново по старой строке под новой версией.
+    """
+    counters.deleting_news.set(
+        counters.deleting_news.get() - {instance.pk}
+    )
+    transaction.on_commit(partial(bump_version, instance.pk))
+
+
+@receiver(post_save, sender=News)
+def news_saved(sender, instance, **kwargs):
+    get_backend().index_news([instance])
+
+
+@receiver(post_delete, sender=News)
+def news_deleted(sender, instance, **kwargs):
+    """Вместе с новостью из индекса уходят и её комментарии."""
+    get_backend().remove_news(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    """
+    Счётчики обновляются и при правках из админки, в той же
+    транзакции; кеш — после коммита.
+    """
+    if created:
+        counters.comment_added(instance)
+    else:
+        counters.comment_changed(instance)
+    transaction.on_commit(partial(comments_changed, instance.news_id))
+    get_backend().index_comments([instance])
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if instance.news_id in counters.deleting_news.get():
+        return
+    counters.comment_removed(instance)
+    transaction.on_commit(partial(comments_changed, instance.news_id))
+    get_backend().remove_comment(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=BadWord)
+def bad_words_changed(sender, **kwargs):
+    """Другие процессы должны перечитать список уже после коммита."""
+    transaction.on_commit(moderation_list.bump)
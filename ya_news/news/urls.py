@@ -1,15 +1,30 @@
+from django.conf import settings
 from django.urls import path
 from news import views
+from news.replicas import reads_from_replica
 
 app_name = 'news'
 
+# Под ASGI (yanews.settings_asgi) страницы чтения асинхронные; под WSGI
+# async view обошлась бы лишним циклом событий на каждый запрос.
+if settings.NEWS_ASYNC_VIEWS:
+    home_view, detail_view = views.news_home, views.news_detail
+else:
+    home_view = views.NewsList.as_view()
+    detail_view = views.NewsDetailView.as_view()
+# Чтения страниц идут на реплики, если они настроены.
+home_view = reads_from_replica(home_view)
+detail_view = reads_from_replica(detail_view)
+
 urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path('', home_view, name='home'),
+    path('news/<int:pk>/', detail_view, name='detail'),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
         name='delete'
     ),
     path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
+    path('search/', views.NewsSearch.as_view(), name='search'),
+    path('export/', views.NewsExport.as_view(), name='export'),
 ]
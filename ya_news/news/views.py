@@ -1,11 +1,25 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import (
+    LoginRequiredMixin, UserPassesTestMixin
+)
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
 from django.views import generic
 
-from .forms import CommentForm
+from .archive import CHUNK_SIZE, FORMATS, archive_records
+from .cache import (
+    cache_call, cached_home_cards, detail_etag, detail_key, home_cards
+)
+from .forms import CommentForm, SearchForm
 from .models import Comment, News
+from .pagination import comments_page, news_page
+from .replicas import primary_reads
+from .search import get_backend, parse_query
 
 
 class NewsList(generic.ListView):
@@ -17,11 +31,19 @@ class NewsList(generic.ListView):
         """
         Выводим только несколько последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество определяется в настройках проекта. Число
+        комментариев хранится в самой новости, комментарии не читаются.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return self.model.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE]
+
+    def get_context_data(self, **kwargs):
+        """Карточки новостей берём из кеша, если их не передали готовыми."""
+        context = super().get_context_data(**kwargs)
+        if 'news_cards' not in context:
+            context['news_cards'] = home_cards(
+                self.model.objects.all(), settings.NEWS_COUNT_ON_HOME_PAGE
+            )
+        return context
 
 
 class NewsDetail(generic.DetailView):
@@ -29,19 +51,73 @@ class NewsDetail(generic.DetailView):
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+        return get_object_or_404(self.model, pk=self.kwargs['pk'])
 
     def get_context_data(self, **kwargs):
+        """
+        Выводим только одну страницу комментариев.
+
+        Следующие страницы доступны по курсору из параметра `after`.
+        """
         context = super().get_context_data(**kwargs)
+        context['comments'], context['next_cursor'] = comments_page(
+            self.object.comment_set.published().select_related('author'),
+            self.request.GET.get('after'),
+            settings.COMMENTS_COUNT_ON_DETAIL_PAGE,
+        )
         if self.request.user.is_authenticated:
             context['form'] = CommentForm()
         return context
 
 
+class NewsSearch(generic.TemplateView):
+    """Поиск по новостям и их комментариям."""
+    template_name = 'news/search.html'
+
+    def get_context_data(self, **kwargs):
+        """
+        Страница найденных новостей от свежих к старым.
+
+        Фрагменты с подсветкой запрашиваются только для новостей страницы.
+        """
+        context = super().get_context_data(**kwargs)
+        form = SearchForm(self.request.GET or None)
+        context['form'] = form
+        if not form.is_valid():
+            return context
+        terms = parse_query(form.cleaned_data['q'])
+        if not terms:
+            context['results'] = []
+            return context
+        backend = get_backend()
+        queryset = backend.filter(
+            News.objects.only('id', 'title', 'date'), terms
+        )
+        if form.cleaned_data['date_from']:
+            queryset = queryset.filter(
+                date__gte=form.cleaned_data['date_from']
+            )
+        if form.cleaned_data['date_to']:
+            queryset = queryset.filter(date__lte=form.cleaned_data['date_to'])
+        results, next_cursor = news_page(
+            queryset,
+            self.request.GET.get('after'),
+            settings.NEWS_SEARCH_RESULTS,
+        )
+        snippets = backend.snippets([news.pk for news in results], terms)
+        context['results'] = [
+            (news, *snippets.get(news.pk, (None, '')))
+            for news in results
+        ]
+        query = self.request.GET.copy()
+        query.pop('after', None)
+        context['first_query'] = query.urlencode()
+        if next_cursor:
+            query['after'] = next_cursor
+            context['next_query'] = query.urlencode()
+        return context
+
+
 class NewsComment(
         LoginRequiredMixin,
         generic.detail.SingleObjectMixin,
@@ -59,23 +135,64 @@ class NewsComment(
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        # Вместе с комментарием сигнал обновляет счётчик новости,
+        # кеш страниц сбрасывается после коммита.
+        with transaction.atomic():
+            comment.save()
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        """Новость уже загружена в post(), второй запрос не нужен."""
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
+
+
+def not_modified(request, etag):
+    """Ответ 304 или 412 по ETag страницы новости, если он уместен."""
+    if etag is None:
+        raise Http404
+    return get_conditional_response(request, etag=etag)
+
+
+def with_etag(response, etag):
+    response['ETag'] = etag
+    patch_vary_headers(response, ('Cookie',))
+    return response
 
 
 class NewsDetailView(generic.View):
+    detail_view = staticmethod(NewsDetail.as_view())
+    comment_view = staticmethod(NewsComment.as_view())
 
     def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+        """
+        Анонимам отдаём страницу с ETag и из кеша.
+
+        Авторизованные пользователи видят форму с CSRF-токеном,
+        поэтому для них страница всегда отрисовывается заново.
+        """
+        view = self.detail_view
+        if request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+        pk = kwargs['pk']
+        etag = detail_etag(pk, request.GET.get('after', ''))
+        response = not_modified(request, etag)
+        if response is None:
+            key = detail_key(pk, etag)
+            response = cache.get(key)
+            if response is None:
+                # Ответ попадёт в кеш: собираем его по основной базе.
+                with primary_reads():
+                    response = view(request, *args, **kwargs).render()
+                if not response.cookies:
+                    cache.set(
+                        key, response, settings.NEWS_DETAIL_CACHE_TIMEOUT
+                    )
+        return with_etag(response, etag)
 
     def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
-        return view(request, *args, **kwargs)
+        return self.comment_view(request, *args, **kwargs)
 
 
 class CommentBase(LoginRequiredMixin):
@@ -83,9 +200,8 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
@@ -102,3 +218,105 @@ class CommentUpdate(CommentBase, generic.UpdateView):
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
+
+
+class NewsExport(LoginRequiredMixin, UserPassesTestMixin, generic.View):
+    """Потоковая выгрузка архива новостей для сотрудников."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'jsonl')
+        if export_format not in FORMATS:
+            raise Http404('Неизвестный формат выгрузки.')
+        lines, content_type = FORMATS[export_format]
+        response = StreamingHttpResponse(
+            lines(archive_records(CHUNK_SIZE)),
+            content_type=f'{content_type}; charset=utf-8',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="news.{export_format}"'
+        )
+        return response
+
+
+# Асинхронные варианты главной и страницы новости для ASGI
+# (NEWS_ASYNC_VIEWS). В Django 3.2 классы представлений не бывают
+# асинхронными, а ORM работает только синхронно, поэтому это функции:
+# кеш читается в цикле событий, база и сессия — одним переходом
+# в синхронный поток.
+
+
+def plain(response):
+    """
+    Отрисованный TemplateResponse как обычный HttpResponse.
+
+    Иначе асинхронный обработчик Django ещё раз вызовет его render()
+    через sync_to_async — лишний переход в синхронный поток.
+    """
+    if not hasattr(response, 'render'):
+        return response
+    result = HttpResponse(
+        response.content,
+        status=response.status_code,
+        headers=response.headers,
+    )
+    result.cookies = response.cookies
+    return result
+
+
+def sync_view(view):
+    """Синхронное представление вместе с отрисовкой — один переход."""
+    def call(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return plain(response)
+    return sync_to_async(call)
+
+
+def anonymous(request):
+    """Без cookie сессии пользователь анонимен, и база не нужна."""
+    return settings.SESSION_COOKIE_NAME not in request.COOKIES
+
+
+news_list_sync = sync_view(NewsList.as_view())
+news_detail_sync = sync_view(NewsDetailView.as_view())
+
+
+async def news_home(request):
+    """Главная: на прогретом кеше — без единого перехода в поток ORM."""
+    cards = await cached_home_cards() if anonymous(request) else None
+    if cards is None:
+        return await news_list_sync(request)
+    view = NewsList()
+    view.setup(request)
+    view.object_list = view.get_queryset()
+    return plain(view.render_to_response(
+        view.get_context_data(news_cards=cards)
+    ).render())
+
+
+async def news_detail(request, pk):
+    """
+    Страница новости для анонима: ETag одним запросом к базе,
+    ответ из кеша. Форму комментария и его отправку обслуживает
+    синхронный NewsDetailView.
+    """
+    if request.method != 'GET' or not anonymous(request):
+        return await news_detail_sync(request, pk=pk)
+    etag = await sync_to_async(detail_etag)(
+        pk, request.GET.get('after', '')
+    )
+    response = not_modified(request, etag)
+    if response is None:
+        key = detail_key(pk, etag)
+        response = await cache_call('get', key)
+        if response is None:
+            return await news_detail_sync(request, pk=pk)
+    return with_etag(plain(response), etag)
@@ -1,8 +1,11 @@
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Общий для обоих проектов пакет yaperf лежит в корне репозитория.
+sys.path.append(str(BASE_DIR.parent))
 
 SECRET_KEY = 'django-insecure-7)dgs++2!#==aye4rd=5)c)bw0eokiyqx0hts6#t80!$c&$s+('
 
@@ -21,6 +24,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yaperf.middleware.PerformanceMiddleware',
+    'yaperf.middleware.NPlusOneMiddleware',
+    'news.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,11 +59,16 @@ WSGI_APPLICATION = 'yanews.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # WAL и прагмы на каждое соединение: см. yaperf.sqlite.base.
+        'ENGINE': 'yaperf.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение с прагмами переживает запрос, а не открывается заново.
+        'CONN_MAX_AGE': 60,
     }
 }
 
+DATABASE_ROUTERS = ['news.replicas.ReplicaRouter']
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -80,3 +91,32 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+COMMENTS_COUNT_ON_DETAIL_PAGE = 20
+
+NEWS_HOME_CACHE_TIMEOUT = 60 * 60
+NEWS_DETAIL_CACHE_TIMEOUT = 60 * 60
+
+# Асинхронные главная и страница новости; включает settings_asgi.
+NEWS_ASYNC_VIEWS = False
+
+# Псевдонимы баз-реплик для чтения страниц новостей; см. news.replicas
+# и settings_replica.
+NEWS_REPLICAS = []
+# Столько секунд после своей записи пользователь читает основную базу.
+NEWS_REPLICA_PIN_SECONDS = 10
+
+MODERATION_CHECK_INTERVAL = 5
+COMMENTS_MODERATION_ASYNC = False
+
+NEWS_SEARCH_BACKEND = 'news.search.Fts5Backend'
+NEWS_SEARCH_RESULTS = 20
+NEWS_SEARCH_SNIPPET_WORDS = 16
+
+PERF_METRICS_ENABLED = False
+PERF_METRICS_LOG_INTERVAL = 0
+# Токен сборщика метрик в Authorization: Bearer; пусто — только staff.
+PERF_METRICS_TOKEN = ''
+
+NPLUSONE_ENABLED = True
+NPLUSONE_THRESHOLD = 5
+NPLUSONE_RAISE = False
@@ -0,0 +1,4 @@
+"""Настройки для запуска под ASGI: асинхронные страницы чтения."""
+from .settings import *  # noqa: F401,F403
+
+NEWS_ASYNC_VIEWS = True
@@ -0,0 +1,13 @@
+"""
+Локальная проверка реплик: вторая база SQLite, которую наполняет
+команда replicate.
+"""
+from .settings import *  # noqa: F401,F403
+
+DATABASES['replica'] = {  # noqa: F405
+    **DATABASES['default'],  # noqa: F405
+    'NAME': BASE_DIR / 'db_replica.sqlite3',  # noqa: F405
+    'TEST': {'MIRROR': 'default'},
+}
+
+NEWS_REPLICAS = ['replica']
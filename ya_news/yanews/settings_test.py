@@ -0,0 +1,35 @@
+"""Настройки тестов: база и кеш в памяти, дешёвый хешер паролей."""
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'yaperf.sqlite',
+        'NAME': ':memory:',
+    },
+    # Реплика в тестах — второе соединение с той же базой в памяти.
+    # read_uncommitted даёт ему видеть данные из транзакции теста,
+    # а DEFERRED — не ждать блокировки записи, которую она держит.
+    'replica': {
+        'ENGINE': 'yaperf.sqlite',
+        'NAME': ':memory:',
+        'OPTIONS': {
+            'pragmas': {'read_uncommitted': 1},
+            'transaction_mode': 'DEFERRED',
+        },
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Стойкость хеша в тестах не нужна, а PBKDF2 — десятки миллисекунд
+# на каждый create_user и admin_client.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+NPLUSONE_RAISE = True
@@ -0,0 +1,18 @@
+import os
+
+
+def setup_django(test_database=None):
+    """
+    Настраивает Django и создаёт чистую тестовую базу для замеров.
+
+    По умолчанию база SQLite в памяти; несколько процессов делят только
+    базу в файле test_database.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    import django
+    django.setup()
+    from django.db import connection
+    if test_database is not None:
+        connection.settings_dict['TEST']['NAME'] = test_database
+        connection.settings_dict['OPTIONS'].setdefault('timeout', 60)
+    connection.creation.create_test_db(verbosity=0)
@@ -0,0 +1,64 @@
+"""
+Нагрузочный замер горячих страниц ya_note: список заметок, заметка
+и создание заметки.
+
+Запуск из каталога ya_note:
+
+    python manage.py loadbench --users 50 --notes 200 --output load.json
+    python manage.py loadbench --compare load.json
+    LOADBENCH_OUTPUT=load.json python -m pytest benchmarks/test_load.py -s
+"""
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from notes.models import Note
+from yaperf.loadbench import Scenario
+
+User = get_user_model()
+
+USERS = 20
+NOTES_PER_USER = 100
+BATCH_SIZE = 500
+
+
+def seed(users=USERS, notes_per_user=NOTES_PER_USER):
+    """
+    Данные пачками через bulk_create.
+
+    Поисковый индекс не строится: замеряемые страницы его не читают.
+    """
+    User.objects.bulk_create(
+        User(username=f'author{index}') for index in range(users)
+    )
+    Note.objects.bulk_create(
+        (
+            Note(
+                title=f'Заметка {index}',
+                text=f'Текст заметки номер {index}. ' * 10,
+                slug=f'author{author_id}-{index}',
+                author_id=author_id,
+            )
+            for author_id in User.objects.values_list('pk', flat=True)
+            for index in range(notes_per_user)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    return {'users': users, 'notes_per_user': notes_per_user}
+
+
+def scenarios():
+    author = User.objects.order_by('pk').first()
+    note = Note.objects.filter(author=author).order_by('pk').first()
+    return [
+        Scenario('notes:list', reverse('notes:list'), user=author),
+        Scenario(
+            'notes:detail', reverse('notes:detail', args=(note.slug,)),
+            user=author,
+        ),
+        Scenario(
+            'notes:add', reverse('notes:add'), user=author,
+            data=lambda number: {
+                'title': f'Под нагрузкой {number}', 'text': 'Текст',
+            },
+        ),
+    ]
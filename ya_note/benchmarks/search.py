@@ -0,0 +1,76 @@
+"""
+Скорость поиска по заметкам на аккаунте с большим числом заметок.
+
+Запуск из каталога ya_note:
+
+    python -m benchmarks.search [число заметок]
+"""
+import random
+import sys
+import time
+
+from benchmarks import setup_django
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщыэюя'
+VOCABULARY_SIZE = 20_000
+# Запросы по частым, средним и редким словам словаря (закон Ципфа).
+QUERY_RANKS = ((5,), (100,), (5000,), (100, 300), (10, 5000))
+REPEAT = 20
+
+
+def vocabulary(generator):
+    return [
+        ''.join(generator.choices(ALPHABET, k=generator.randint(4, 9)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+
+
+def main(notes_count):
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+    from django.test import override_settings
+
+    from notes.models import Note
+    from notes.search import get_backend, search_notes
+
+    author = get_user_model().objects.create(username='Автор')
+    generator = random.Random(0)
+    words = vocabulary(generator)
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    queries = [
+        ' '.join(words[rank] for rank in ranks) for ranks in QUERY_RANKS
+    ]
+    for backend in ('fts5', 'python'):
+        with override_settings(NOTES_SEARCH_BACKEND=backend):
+            with transaction.atomic():
+                Note.objects.bulk_create(
+                    Note(
+                        title=f'Заметка {index}',
+                        text=' '.join(
+                            generator.choices(words, weights, k=30)
+                        ),
+                        slug=f'note-{index}',
+                        author=author,
+                    )
+                    for index in range(notes_count)
+                )
+                started = time.perf_counter()
+                index = get_backend()
+                for note in Note.objects.iterator():
+                    index.index(note)
+                build = time.perf_counter() - started
+            print(f'{backend}: индекс {notes_count} заметок за {build:.1f} с')
+            for query in queries:
+                timings = []
+                for _ in range(REPEAT):
+                    started = time.perf_counter()
+                    found = search_notes(author, query, 50)
+                    timings.append(time.perf_counter() - started)
+                print(f'  {query!r}: {min(timings) * 1e3:.1f} мс, '
+                      f'найдено {len(found)}')
+            Note.objects.all().delete()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
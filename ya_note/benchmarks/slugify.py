@@ -0,0 +1,66 @@
+"""
+Транслитерация pytils с кешем и без на типичных нагрузках.
+
+Запуск из каталога ya_note:
+
+    python -m benchmarks.slugify
+"""
+import random
+import timeit
+
+from pytils import translit
+
+from notes.slugs import slugify
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщыэюя'
+REPEAT = 5
+
+
+def random_words(generator, count):
+    return [
+        ''.join(generator.choices(ALPHABET, k=generator.randint(4, 9)))
+        for _ in range(count)
+    ]
+
+
+def run(function, texts):
+    for text in texts:
+        function(text)
+
+
+def best_time(function, texts):
+    def measure():
+        slugify.cache_clear()
+        run(function, texts)
+    return min(timeit.repeat(measure, number=1, repeat=REPEAT))
+
+
+def main():
+    generator = random.Random(0)
+    words = random_words(generator, 5000)
+    titles = [
+        ' '.join(generator.choices(words, k=5)).capitalize()
+        for _ in range(10_000)
+    ]
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    loads = {
+        # Форма и модель для одной заметки.
+        'один заголовок x10000': [titles[0]] * 10_000,
+        # Импорт, где заголовки повторяются («Покупки», «Идеи»...).
+        'импорт, 200 разных из 10000': generator.choices(
+            titles[:200], k=10_000
+        ),
+        # Импорт без повторов: худший случай для кеша.
+        'импорт, все разные': titles,
+        # Слова заметок для поискового индекса.
+        'слова, закон Ципфа': generator.choices(words, weights, k=100_000),
+    }
+    print(f'{"нагрузка":<30} {"pytils, мс":>11} {"с кешем, мс":>12}')
+    for name, texts in loads.items():
+        plain = best_time(translit.slugify, texts)
+        cached = best_time(slugify, texts)
+        print(f'{name:<30} {plain * 1e3:>11.1f} {cached * 1e3:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
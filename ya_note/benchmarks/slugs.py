@@ -0,0 +1,85 @@
+"""
+Параллельное создание заметок с одинаковым заголовком.
+
+Сравнивается подбор slug моделью (один запрос занятых slug и повтор
+при IntegrityError) с перебором base, base-2, ... через exists().
+Процессы пишут в общую базу SQLite в файле.
+
+Запуск из каталога ya_note:
+
+    python -m benchmarks.slugs [процессов] [заметок на процесс]
+"""
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+
+from benchmarks import setup_django
+
+TITLE = 'Список покупок'
+
+
+def probe_slug(base):
+    """Прежний способ: по запросу exists() на каждый занятый вариант."""
+    from notes.models import Note
+    slug, number = base, 1
+    while Note.objects.filter(slug=slug).exists():
+        number += 1
+        slug = f'{base}-{number}'
+    return slug
+
+
+def create_notes(strategy, author_id, count):
+    from django.db import IntegrityError, connection
+
+    from notes.models import Note
+    from notes.slugs import base_slug
+
+    # Соединение родителя после fork не переиспользуется.
+    connection.close()
+    failed = 0
+    for _ in range(count):
+        note = Note(title=TITLE, text='Текст', author_id=author_id)
+        if strategy == 'probe':
+            note.slug = probe_slug(base_slug(TITLE, 100))
+        try:
+            note.save()
+        except IntegrityError:
+            failed += 1
+    connection.close()
+    return failed
+
+
+def main(workers, count):
+    database = os.path.join(tempfile.mkdtemp(), 'slugs.sqlite3')
+    setup_django(database)
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+
+    from notes.models import Note
+
+    author = get_user_model().objects.create(username='Автор')
+    connection.close()
+    pool = get_context('fork').Pool(workers)
+    for strategy in ('allocator', 'probe'):
+        started = time.perf_counter()
+        failed = sum(pool.starmap(
+            create_notes, [(strategy, author.pk, count)] * workers
+        ))
+        elapsed = time.perf_counter() - started
+        created = Note.objects.count()
+        unique = Note.objects.values('slug').distinct().count()
+        print(f'{strategy}: {created} заметок за {elapsed:.2f} с, '
+              f'{created / elapsed:.0f} в секунду, '
+              f'ошибок IntegrityError {failed}, уникальных slug {unique}')
+        Note.objects.all().delete()
+        connection.close()
+    pool.close()
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    )
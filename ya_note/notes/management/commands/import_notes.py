@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.transfer import BATCH_SIZE, NoteImport, TransferError, read_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает заметки пользователя из JSON Lines или ZIP '
+        'с файлами Markdown.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('Нет такого пользователя.')
+        try:
+            with open(options['path'], 'rb') as file:
+                result = NoteImport(author, options['batch_size']).run(
+                    read_rows(file)
+                )
+        except (OSError, TransferError) as error:
+            raise CommandError(error)
+        for number, message in result.errors:
+            self.stderr.write(f'Запись {number}: {message}')
+        self.stdout.write(
+            f'Добавлено заметок: {result.created}, '
+            f'с ошибками: {len(result.errors)}'
+        )
@@ -0,0 +1,17 @@
+from benchmarks.load import NOTES_PER_USER, USERS, scenarios, seed
+from yaperf.loadbench import LoadBenchCommand
+
+
+class Command(LoadBenchCommand):
+    project = 'ya_note'
+
+    def add_volume_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=USERS)
+        parser.add_argument(
+            '--notes', type=int, default=NOTES_PER_USER,
+            help='Заметок у каждого пользователя.',
+        )
+
+    def seed(self, options):
+        volumes = seed(options['users'], options['notes'])
+        return volumes, scenarios()
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes.models import Note
+from notes.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс заметок пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.clear()
+        last_pk, indexed = 0, 0
+        while True:
+            notes = list(
+                Note.objects.filter(pk__gt=last_pk).order_by('pk').only(
+                    'id', 'author_id', 'title', 'text'
+                )[:options['batch_size']]
+            )
+            if not notes:
+                break
+            with transaction.atomic():
+                for note in notes:
+                    backend.index(note)
+            last_pk = notes[-1].pk
+            indexed += len(notes)
+        self.stdout.write(
+            f'Проиндексировано заметок: {indexed} ({type(backend).__name__})'
+        )
@@ -1,6 +1,10 @@
 from django.conf import settings
-from django.db import models
-from pytils.translit import slugify
+from django.db import IntegrityError, models, transaction
+
+from .slugs import base_slug, unique_slug
+
+# Сколько раз пересчитывать slug, если его успели занять параллельно.
+SLUG_ATTEMPTS = 10
 
 
 class Note(models.Model):
@@ -22,16 +26,61 @@ class Note(models.Model):
         help_text=('Укажите адрес для страницы заметки. Используйте только '
                    'латиницу, цифры, дефисы и знаки подчёркивания')
     )
+    # Поиск по автору обслуживает составной индекс (author, id).
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        db_index=False,
     )
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Пустой slug выводится из заголовка.
+
+        Занятые slug с той же основой читаются одним запросом. Если
+        параллельный запрос успел сохранить такой же, база отвергает
+        вставку, и slug подбирается заново.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        max_length = self._meta.get_field('slug').max_length
+        base = base_slug(self.title, max_length)
+        others = Note.objects.exclude(pk=self.pk)
+        for attempt in range(1, SLUG_ATTEMPTS + 1):
+            self.slug = unique_slug(others, base, max_length)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if attempt == SLUG_ATTEMPTS:
+                    self.slug = ''
+                    raise
+
+
+class NoteToken(models.Model):
+    """Слово заметки в запасном поисковом индексе (без FTS5)."""
+    TOKEN_LENGTH = 100
+
+    note = models.ForeignKey(Note, on_delete=models.CASCADE)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    token = models.CharField(max_length=TOKEN_LENGTH)
+    count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'token'), name='notetoken_author_token_idx'
+            ),
+        )
@@ -0,0 +1,166 @@
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Note, NoteToken
+from .slugs import slugify
+
+WORD = re.compile(r'[^\W_]+')
+FTS_TABLE = 'notes_note_fts'
+
+
+def normalize(word):
+    """
+    Форма слова в индексе — та же транслитерация pytils, что и в slug.
+
+    Поэтому «Ёлка», «ёлка» и «yolka» совпадают. Слова, которые pytils
+    не транслитерирует, остаются как есть в нижнем регистре.
+    """
+    return slugify(word).replace('-', '') or word.lower()
+
+
+def tokenize(text):
+    """Формы слов текста; для слов с «ё» добавляется и вариант с «е»."""
+    tokens = []
+    for word in WORD.findall(text):
+        tokens.append(normalize(word))
+        if 'ё' in word.lower():
+            tokens.append(normalize(word.lower().replace('ё', 'е')))
+    return tokens
+
+
+def note_tokens(note):
+    return tokenize(f'{note.title} {note.text}')
+
+
+class InvertedIndexBackend:
+    """Инвертированный индекс в таблице NoteToken, ключ (author, token)."""
+
+    def index(self, note):
+        self.remove(note.pk)
+        counts = defaultdict(int)
+        for token in note_tokens(note):
+            counts[token[:NoteToken.TOKEN_LENGTH]] += 1
+        NoteToken.objects.bulk_create(
+            NoteToken(
+                note_id=note.pk, author_id=note.author_id,
+                token=token, count=count,
+            )
+            for token, count in counts.items()
+        )
+
+    def remove(self, note_id):
+        NoteToken.objects.filter(note_id=note_id).delete()
+
+    def clear(self):
+        NoteToken.objects.all().delete()
+
+    def search(self, author, terms, limit):
+        """Заметки со всеми словами запроса (по префиксу), по частоте."""
+        scores = None
+        for term in terms:
+            term_scores = defaultdict(int)
+            # Префикс как диапазон: LIKE с ESCAPE SQLite не ищет по индексу.
+            for note_id, count in NoteToken.objects.filter(
+                author=author, token__gte=term, token__lt=term + '\U0010ffff'
+            ).values_list('note_id', 'count'):
+                term_scores[note_id] += count
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    note_id: score + term_scores[note_id]
+                    for note_id, score in scores.items()
+                    if note_id in term_scores
+                }
+        ranked = sorted(scores or {}, key=lambda pk: (-scores[pk], pk))
+        return ranked[:limit]
+
+
+class Fts5Backend:
+    """SQLite FTS5: автор — отдельная колонка, текст — формы слов."""
+
+    def index(self, note):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [note.pk]
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, author, body) '
+                'VALUES (%s, %s, %s)',
+                [note.pk, f'a{note.author_id}', ' '.join(note_tokens(note))],
+            )
+
+    def remove(self, note_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [note_id]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def search(self, author, terms, limit):
+        match = 'author:a{} AND body:({})'.format(
+            author.pk, ' AND '.join(f'"{term}"*' for term in terms)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                'ORDER BY rank LIMIT %s',
+                [match, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def fts5_available():
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [FTS_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+_backends = {}
+
+
+def get_backend():
+    """
+    Движок поиска из NOTES_SEARCH_BACKEND: fts5, python или auto.
+
+    В режиме auto FTS5 используется, если миграция смогла создать
+    его таблицу. Выбор запоминается для соединения с базой.
+    """
+    choice = settings.NOTES_SEARCH_BACKEND
+    if choice == 'auto':
+        key = connection.settings_dict['NAME']
+        if key not in _backends:
+            _backends[key] = 'fts5' if fts5_available() else 'python'
+        choice = _backends[key]
+    return Fts5Backend() if choice == 'fts5' else InvertedIndexBackend()
+
+
+def index_note(note):
+    get_backend().index(note)
+
+
+def remove_note(note_id):
+    get_backend().remove(note_id)
+
+
+def search_notes(author, query, limit):
+    """Заметки автора по запросу в порядке релевантности."""
+    terms = list(dict.fromkeys(normalize(word) for word in WORD.findall(
+        query
+    )))
+    if not terms:
+        return []
+    ids = get_backend().search(author, terms, limit)
+    notes = Note.objects.only('id', 'slug', 'title').in_bulk(ids)
+    return [notes[pk] for pk in ids if pk in notes]
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Note
+from .search import index_note, remove_note
+
+
+@receiver(post_save, sender=Note)
+def note_saved(sender, instance, **kwargs):
+    index_note(instance)
+
+
+@receiver(post_delete, sender=Note)
+def note_deleted(sender, instance, **kwargs):
+    remove_note(instance.pk)
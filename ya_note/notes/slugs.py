@@ -0,0 +1,91 @@
+import re
+from functools import lru_cache
+
+from django.db.models import Q
+from pytils import translit
+
+# Место под суффикс «-<номер>» у длинных slug.
+SUFFIX_LENGTH = 11
+SLUGIFY_CACHE_SIZE = 4096
+# Для заголовков, от которых транслитерация ничего не оставила.
+DEFAULT_SLUG = 'note'
+
+
+@lru_cache(maxsize=SLUGIFY_CACHE_SIZE)
+def slugify(text):
+    """
+    pytils.translit.slugify с кешем последних результатов.
+
+    Заголовки в импорте и слова в поисковом индексе часто повторяются,
+    а транслитерация проходит текст несколькими регулярными выражениями.
+    """
+    return translit.slugify(text)
+
+
+def base_slug(title, max_length):
+    return slugify(title)[:max_length] or DEFAULT_SLUG
+
+
+def slug_stem(base, max_length):
+    """Часть base, которую сохраняют все slug с номером от неё."""
+    return base[:max_length - SUFFIX_LENGTH]
+
+
+def starts_with(stem):
+    """
+    Условие на slug с префиксом stem.
+
+    Префикс задан диапазоном: LIKE с ESCAPE SQLite не ищет по индексу.
+    """
+    return Q(slug__gte=stem, slug__lt=stem + '\U0010ffff')
+
+
+class SlugAllocator:
+    """
+    Свободные slug среди занятых taken, без запросов к базе.
+
+    Занятый base получает суффикс на единицу больше наибольшего
+    из уже выданных: base-2, base-3 и так далее. У длинного base
+    суффикс заменяет его конец, чтобы уложиться в max_length.
+    Наибольшие номера основ считаются один раз при создании.
+    """
+
+    NUMBERED = re.compile(r'(.*)-(\d+)')
+
+    def __init__(self, taken, max_length):
+        self.taken = set(taken)
+        self.max_length = max_length
+        self.numbers = {}
+        for slug in self.taken:
+            self.count(slug)
+
+    def count(self, slug):
+        match = self.NUMBERED.fullmatch(slug)
+        if match:
+            stem, number = match.group(1), int(match.group(2))
+            self.numbers[stem] = max(self.numbers.get(stem, 1), number)
+
+    def add(self, slug):
+        self.taken.add(slug)
+        self.count(slug)
+
+    def allocate(self, base):
+        slug = base
+        if slug in self.taken:
+            stem = slug_stem(base, self.max_length)
+            slug = f'{stem}-{self.numbers.get(stem, 1) + 1}'
+        self.add(slug)
+        return slug
+
+
+def taken_slugs(queryset, base, max_length):
+    """Все slug, с которыми может столкнуться base, — одним запросом."""
+    return set(queryset.filter(
+        starts_with(slug_stem(base, max_length))
+    ).values_list('slug', flat=True))
+
+
+def unique_slug(queryset, base, max_length):
+    return SlugAllocator(
+        taken_slugs(queryset, base, max_length), max_length
+    ).allocate(base)
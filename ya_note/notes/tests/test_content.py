@@ -1,11 +1,16 @@
 from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
 from django.urls import reverse
 
 from notes.forms import NoteForm
 from notes.models import Note
+from notes.views import NotesList
+from yaperf.metrics import registry
+from yaperf.middleware import NPlusOneMiddleware
+from yaperf.nplusone import NPlusOneError
 
 
 User = get_user_model()
@@ -62,3 +67,129 @@ class TestListPage(TestCase):
                     response = self.client.get(self.url)
                     self.assertEqual(response.status_code, HTTPStatus.OK)
                     self.assertNotIn('form', response.context)
+
+
+@override_settings(NOTES_COUNT_ON_LIST_PAGE=10)
+class TestListPagination(TestCase):
+    LIST_URL = reverse('notes:list')
+    NOTES_COUNT = 25
+    LONG_TEXT = 'Очень длинный текст заметки. ' * 1000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Писатель')
+        cls.reader = User.objects.create(username='Читатель')
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {index}',
+                text=cls.LONG_TEXT,
+                slug=f'{author.pk}-note-{index}',
+                author=author,
+            )
+            for index in range(cls.NOTES_COUNT)
+            for author in (cls.author, cls.reader)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_keyset_pages(self):
+        expected_ids = list(
+            Note.objects.filter(author=self.author).order_by(
+                'id'
+            ).values_list('id', flat=True)
+        )
+        shown_ids = []
+        data = {}
+        while True:
+            # Сессия, пользователь и одна выборка заметок.
+            with self.assertNumQueries(3):
+                response = self.client.get(self.LIST_URL, data=data)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            notes = response.context['object_list']
+            self.assertLessEqual(len(notes), 10)
+            for note in notes:
+                self.assertIn('text', note.get_deferred_fields())
+            self.assertLess(len(response.content), 5000)
+            shown_ids += [note.id for note in notes]
+            if response.context['next_cursor'] is None:
+                break
+            data = {'after': response.context['next_cursor']}
+        self.assertEqual(shown_ids, expected_ids)
+
+    def test_bad_cursor(self):
+        for after in ('bad', '-1', '9' * 23):
+            with self.subTest(after=after):
+                response = self.client.get(
+                    self.LIST_URL, data={'after': after}
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_FOUND
+                )
+
+    def test_list_uses_author_index(self):
+        request = RequestFactory().get(self.LIST_URL)
+        request.user = self.author
+        view = NotesList()
+        view.setup(request)
+        plan = view.get_queryset()[:11].explain()
+        self.assertIn('note_author_id_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+
+@override_settings(PERF_METRICS_ENABLED=True)
+class TestPerformanceMetrics(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+
+    def setUp(self):
+        registry.clear()
+        self.addCleanup(registry.clear)
+
+    def test_list_page_metrics(self):
+        client = Client()
+        client.force_login(self.author)
+        response = client.get(reverse('notes:list'))
+        size = registry.get('response_bytes', 'notes:list')
+        self.assertEqual(size.sum, len(response.content))
+        self.assertGreater(registry.get('sql_queries', 'notes:list').sum, 0)
+
+
+@override_settings(NPLUSONE_RAISE=True)
+class TestNPlusOne(TestCase):
+    NOTES = 8
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {index}', text='Текст',
+                slug=f'zametka-{index}', author=cls.author,
+            )
+            for index in range(cls.NOTES)
+        )
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_pages_have_no_repeated_queries(self):
+        for url in (
+            reverse('notes:list'),
+            reverse('notes:detail', args=('zametka-0',)),
+        ):
+            with self.subTest(url=url):
+                response = self.author_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_repeated_queries_are_reported(self):
+        def view(request):
+            for note in Note.objects.only('id'):
+                note.slug
+            return HttpResponse()
+
+        with self.assertRaisesMessage(NPlusOneError, 'notes_note'):
+            NPlusOneMiddleware(view)(RequestFactory().get('/'))
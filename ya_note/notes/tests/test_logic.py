@@ -1,12 +1,16 @@
 from http import HTTPStatus
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
 from pytest_django.asserts import assertFormError, assertRedirects
+from pytils import translit
 
+from notes import models
 from notes.forms import WARNING
 from notes.models import Note
+from notes.slugs import slugify, unique_slug
 
 
 User = get_user_model()
@@ -126,3 +130,75 @@ class TestNoteEditDelite(TestCase):
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         count = Note.objects.count()
         self.assertEqual(count, 1)
+
+
+class TestSlugAllocation(TestCase):
+    TITLE = 'Заголовок'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор заметки')
+        cls.url = reverse('notes:add')
+
+    def create(self, title=TITLE):
+        return Note.objects.create(
+            title=title, text='Текст', author=self.author
+        )
+
+    def test_same_titles_get_suffixes(self):
+        slugs = [self.create().slug for _ in range(3)]
+        self.assertEqual(slugs, ['zagolovok', 'zagolovok-2', 'zagolovok-3'])
+
+    def test_one_query_for_taken_slugs(self):
+        for _ in range(5):
+            self.create()
+        self.create('Заголовок длиннее')
+        with self.assertNumQueries(1):
+            slug = unique_slug(Note.objects.all(), 'zagolovok', 100)
+        self.assertEqual(slug, 'zagolovok-6')
+
+    def test_long_title_suffix_fits(self):
+        title = 'Очень длинный заголовок ' * 10
+        first, second = self.create(title[:100]), self.create(title[:100])
+        self.assertEqual(len(first.slug), 100)
+        self.assertLessEqual(len(second.slug), 100)
+        self.assertTrue(second.slug.endswith('-2'))
+
+    def test_retry_after_concurrent_insert(self):
+        """Параллельный запрос занял slug между чтением и вставкой."""
+        self.create()
+        stale = iter(['zagolovok'])
+
+        def allocate(queryset, base, max_length):
+            return next(stale, None) or unique_slug(
+                queryset, base, max_length
+            )
+
+        with mock.patch.object(models, 'unique_slug', allocate):
+            note = self.create()
+        self.assertEqual(note.slug, 'zagolovok-2')
+
+    def test_form_allocates_slug_for_same_title(self):
+        self.create()
+        client = Client()
+        client.force_login(self.author)
+        response = client.post(
+            self.url, data={'title': self.TITLE, 'text': 'Текст'}
+        )
+        self.assertRedirects(response, reverse('notes:success'))
+        self.assertTrue(Note.objects.filter(slug='zagolovok-2').exists())
+
+
+class TestSlugify(TestCase):
+    TEXTS = (
+        'Заголовок', 'Ёлка и ЁЖИК', 'Съешь же ещё этих мягких булок',
+        'Hello, World!', 'Заметка №5: 100% готово', '  пробелы  ',
+        'дефис-и_подчёркивание', '!!!', '', 'Очень длинный заголовок ' * 10,
+    )
+
+    def test_matches_pytils(self):
+        slugify.cache_clear()
+        for text in self.TEXTS * 2:
+            with self.subTest(text=text):
+                self.assertEqual(slugify(text), translit.slugify(text))
+        self.assertEqual(slugify.cache_info().hits, len(self.TEXTS))
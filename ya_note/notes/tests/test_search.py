@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes.models import Note, NoteToken
+from notes.search import search_notes, tokenize
+
+
+User = get_user_model()
+
+
+class SearchMixin:
+    SEARCH_URL = reverse('notes:search')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.reader = User.objects.create(username='Читатель')
+        cls.tree = Note.objects.create(
+            title='Ёлка', text='Нарядили ёлку, ёлка стоит.', author=cls.author
+        )
+        cls.shop = Note.objects.create(
+            title='Покупки', text='Купить игрушки на ёлку.', author=cls.author
+        )
+        cls.foreign = Note.objects.create(
+            title='Ёлка соседа', text='Чужая заметка', author=cls.reader
+        )
+
+    def search(self, query):
+        return search_notes(self.author, query, 50)
+
+    def test_russian_and_transliterated_queries(self):
+        for query in ('ёлка', 'ЁЛКА', 'yolka', 'елка', 'ёл'):
+            with self.subTest(query=query):
+                self.assertIn(self.tree, self.search(query))
+
+    def test_search_is_scoped_to_author(self):
+        self.assertNotIn(self.foreign, self.search('ёлка'))
+
+    def test_all_words_required_and_ranked(self):
+        self.assertEqual(self.search('ёл'), [self.tree, self.shop])
+        self.assertEqual(self.search('купить ёлку'), [self.shop])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.shop.text = 'Купить гирлянду.'
+        self.shop.save()
+        self.assertEqual(self.search('гирлянду'), [self.shop])
+        self.assertEqual(self.search('игрушки'), [])
+        self.shop.delete()
+        self.assertEqual(self.search('гирлянду'), [])
+
+    def test_rebuild_command(self):
+        Note.objects.filter(pk=self.shop.pk).update(text='Новый текст')
+        call_command('rebuild_notes_search', verbosity=0, stdout=None)
+        self.assertEqual(self.search('новый'), [self.shop])
+
+    def test_search_page(self):
+        self.client.force_login(self.author)
+        response = self.client.get(self.SEARCH_URL, {'q': 'покупки'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(list(response.context['object_list']), [self.shop])
+
+
+@override_settings(NOTES_SEARCH_BACKEND='fts5')
+class TestFts5Search(SearchMixin, TestCase):
+
+    def test_no_fallback_tokens(self):
+        self.assertFalse(NoteToken.objects.exists())
+
+
+@override_settings(NOTES_SEARCH_BACKEND='python')
+class TestInvertedIndexSearch(SearchMixin, TestCase):
+
+    def test_tokens_stored_per_author(self):
+        self.assertTrue(
+            NoteToken.objects.filter(author=self.author, token='yolka')
+        )
+
+
+class TestTokenize(TestCase):
+
+    def test_tokens_match_slug_transliteration(self):
+        self.assertEqual(
+            tokenize('Ёлка, щука_2 日本'),
+            ['yolka', 'elka', 'schuka', '2', '日本'],
+        )
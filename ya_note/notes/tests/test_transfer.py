@@ -0,0 +1,230 @@
+import io
+import json
+import os
+import tempfile
+import zipfile
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes import transfer
+from notes.forms import WARNING
+from notes.models import Note
+from notes.search import search_notes
+from notes.transfer import NoteImport, read_rows
+
+
+User = get_user_model()
+
+ROWS = (
+    {'title': 'Заголовок', 'text': 'Первая'},
+    {'title': 'Заголовок', 'text': 'Вторая'},
+    {'title': 'Своя', 'text': 'Текст', 'slug': 'svoj-adres'},
+    {'title': 'Дубль', 'text': 'Текст', 'slug': 'zanyat'},
+    'не JSON',
+    {'title': 'Без текста'},
+)
+
+
+def jsonl(rows):
+    return '\n'.join(
+        row if isinstance(row, str) else json.dumps(row, ensure_ascii=False)
+        for row in rows
+    ).encode('utf-8')
+
+
+def markdown_zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+class TestNotesImport(TestCase):
+    IMPORT_URL = reverse('notes:import')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.other = User.objects.create(username='Другой')
+        Note.objects.create(
+            title='Занят', text='Текст', slug='zanyat', author=cls.other
+        )
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def upload(self, name, content):
+        return self.author_client.post(
+            self.IMPORT_URL, {'file': SimpleUploadedFile(name, content)}
+        )
+
+    def test_anonymous_user_is_redirected(self):
+        response = self.client.get(self.IMPORT_URL)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_import_jsonl_reports_row_errors(self):
+        response = self.upload('notes.jsonl', jsonl(ROWS))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        result = response.context['result']
+        self.assertEqual(result.created, 3)
+        self.assertEqual(
+            [number for number, _ in result.errors], [4, 5, 6]
+        )
+        self.assertEqual(result.errors[0][1], 'zanyat' + WARNING)
+        self.assertEqual(
+            list(Note.objects.filter(author=self.author).order_by(
+                'pk'
+            ).values_list('slug', flat=True)),
+            ['zagolovok', 'zagolovok-2', 'svoj-adres'],
+        )
+
+    def test_imported_notes_are_searchable(self):
+        self.upload('notes.jsonl', jsonl(ROWS))
+        self.assertEqual(
+            [note.slug for note in search_notes(self.author, 'вторая', 10)],
+            ['zagolovok-2'],
+        )
+
+    def test_import_markdown_zip(self):
+        response = self.upload('notes.zip', markdown_zip({
+            'a.md': '# Покупки\n\nХлеб, молоко',
+            'papka/Идеи.md': 'Без заголовка',
+            'kartinka.png': 'не заметка',
+        }))
+        self.assertEqual(response.context['result'].created, 2)
+        self.assertEqual(
+            Note.objects.get(slug='pokupki').text, 'Хлеб, молоко'
+        )
+        self.assertEqual(Note.objects.get(slug='idei').title, 'Идеи')
+
+    def test_oversized_markdown_file(self):
+        with mock.patch.object(transfer, 'MAX_NOTE_SIZE', 20):
+            response = self.upload('notes.zip', markdown_zip({
+                'big.md': 'x' * 21,
+                'small.md': 'Коротко',
+            }))
+        result = response.context['result']
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.errors, [(1, 'big.md: больше 20 байт.')])
+
+    def test_slugs_allocated_in_memory(self):
+        rows = [{'title': 'Заголовок', 'text': str(i)} for i in range(6)]
+        with CaptureQueriesContext(connection) as captured:
+            NoteImport(self.author, batch_size=3).run(rows)
+        note_queries = [
+            query['sql'] for query in captured.captured_queries
+            if 'FROM "notes_note"' in query['sql']
+        ]
+        # Занятые slug один раз на основу, затем на пачку —
+        # перечитывание вставленных заметок для поискового индекса.
+        self.assertEqual(len(note_queries), 3)
+
+    def test_only_batch_slugs_prefetched(self):
+        Note.objects.create(
+            title='Заголовок', text='Текст', author=self.other
+        )
+        note_import = NoteImport(self.author).run(
+            [{'title': 'Заголовок', 'text': 'Импорт'}]
+        )
+        self.assertEqual(note_import.slugs.taken, {
+            'zagolovok', 'zagolovok-2'
+        })
+
+    def test_slug_taken_during_import(self):
+        note_import = NoteImport(self.author)
+        Note.objects.create(
+            title='Заголовок', text='Параллельно', author=self.other
+        )
+        note_import.run([{'title': 'Заголовок', 'text': 'Импорт'}])
+        self.assertEqual(note_import.created, 1)
+        self.assertEqual(
+            Note.objects.get(author=self.author).slug, 'zagolovok-2'
+        )
+
+    def test_import_and_export_commands(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'notes.jsonl')
+            with open(path, 'wb') as file:
+                file.write(jsonl(ROWS))
+            out, err = io.StringIO(), io.StringIO()
+            call_command(
+                'import_notes', self.author.username, path,
+                stdout=out, stderr=err,
+            )
+            self.assertIn(
+                'Добавлено заметок: 3, с ошибками: 3', out.getvalue()
+            )
+            self.assertIn('Запись 4', err.getvalue())
+            export = os.path.join(directory, 'export.zip')
+            call_command(
+                'export_notes', self.author.username, '--format=zip',
+                f'--output={export}',
+            )
+            with zipfile.ZipFile(export) as archive:
+                self.assertEqual(len(archive.namelist()), 3)
+
+
+class TestNotesExport(TestCase):
+    EXPORT_URL = reverse('notes:export')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.reader = User.objects.create(username='Читатель')
+        for index in range(3):
+            Note.objects.create(
+                title=f'Заметка {index}', text=f'Текст {index}',
+                author=cls.author,
+            )
+        Note.objects.create(title='Чужая', text='Текст', author=cls.reader)
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def export(self, export_format):
+        response = self.author_client.get(
+            self.EXPORT_URL, {'format': export_format}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_export_jsonl(self):
+        rows = [
+            json.loads(line)
+            for line in self.export('jsonl').decode('utf-8').splitlines()
+        ]
+        self.assertEqual(
+            rows,
+            [
+                {'title': note.title, 'text': note.text, 'slug': note.slug}
+                for note in Note.objects.filter(author=self.author)
+            ],
+        )
+
+    def test_export_zip_round_trip(self):
+        content = self.export('zip')
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertEqual(
+                sorted(archive.namelist()),
+                ['zametka-0.md', 'zametka-1.md', 'zametka-2.md'],
+            )
+        rows = list(read_rows(io.BytesIO(content)))
+        self.assertEqual(
+            rows[0], {'title': 'Заметка 0', 'text': 'Текст 0'}
+        )
+
+    def test_unknown_format(self):
+        response = self.author_client.get(self.EXPORT_URL, {'format': 'xml'})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,269 @@
+import json
+import zipfile
+from functools import reduce
+from operator import or_
+from pathlib import PurePosixPath
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .forms import WARNING, NoteForm
+from .models import Note
+from .search import index_note
+from .slugs import SlugAllocator, base_slug, slug_stem, starts_with
+
+BATCH_SIZE = 500
+CHUNK_SIZE = 1000
+# Глубину выражения в SQLite ограничивает SQLITE_MAX_EXPR_DEPTH.
+PREFIXES_PER_QUERY = 100
+# Файл из архива распаковывается в память целиком.
+MAX_NOTE_SIZE = 1024 * 1024
+MARKDOWN_SUFFIX = '.md'
+HEADING = '# '
+
+
+class TransferError(ValueError):
+    pass
+
+
+class NoteRowForm(NoteForm):
+    """Проверка строки импорта; уникальность slug проверяет импорт."""
+
+    def clean_slug(self):
+        return self.cleaned_data.get('slug')
+
+
+def read_jsonl(file):
+    """Строки JSON Lines: объекты с полями title, text и slug."""
+    for line in file:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield TransferError(f'Некорректный JSON: {error}')
+            continue
+        yield row if isinstance(row, dict) else TransferError(
+            'Строка должна быть объектом JSON.'
+        )
+
+
+def parse_markdown(name, content):
+    """Заголовок — первая строка «# …», иначе имя файла."""
+    title = PurePosixPath(name).stem
+    first, _, rest = content.partition('\n')
+    if first.startswith(HEADING):
+        title, content = first[len(HEADING):].strip(), rest.lstrip('\n')
+    return {'title': title, 'text': content}
+
+
+def read_markdown_zip(file):
+    """Файлы .md из ZIP-архива; slug подбирается по заголовку."""
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile as error:
+        raise TransferError(f'Некорректный ZIP-архив: {error}')
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.endswith(MARKDOWN_SUFFIX):
+                continue
+            if info.file_size > MAX_NOTE_SIZE:
+                yield TransferError(
+                    f'{info.filename}: больше {MAX_NOTE_SIZE} байт.'
+                )
+                continue
+            try:
+                content = archive.read(info).decode('utf-8')
+            except (UnicodeDecodeError, zipfile.BadZipFile) as error:
+                yield TransferError(f'{info.filename}: {error}')
+                continue
+            yield parse_markdown(info.filename, content)
+
+
+def read_rows(file):
+    """Формат загрузки определяется по содержимому."""
+    if zipfile.is_zipfile(file):
+        file.seek(0)
+        return read_markdown_zip(file)
+    file.seek(0)
+    return read_jsonl(file)
+
+
+class NoteImport:
+    """
+    Загрузка заметок автора пачками через bulk_create.
+
+    На пачку одним запросом читаются занятые slug с теми же основами,
+    новые выдаются в памяти. Ошибки строк собираются в errors как
+    (номер строки, сообщение) и не останавливают загрузку остальных.
+    """
+
+    def __init__(self, author, batch_size=BATCH_SIZE):
+        self.author = author
+        self.batch_size = batch_size
+        self.max_length = Note._meta.get_field('slug').max_length
+        self.slugs = SlugAllocator((), self.max_length)
+        self.stems = set()
+        self.created = 0
+        self.errors = []
+
+    def run(self, rows):
+        batch = []
+        for number, row in enumerate(rows, 1):
+            batch.append((number, self.build(row)))
+            if len(batch) >= self.batch_size:
+                self.load(batch)
+                batch = []
+        self.load(batch)
+        return self
+
+    def build(self, row):
+        """Заметка без проверки slug или сообщение об ошибке строки."""
+        if isinstance(row, Exception):
+            return str(row)
+        form = NoteRowForm(row)
+        if not form.is_valid():
+            return '; '.join(
+                f'{field}: {" ".join(errors)}'
+                for field, errors in form.errors.items()
+            )
+        note = form.save(commit=False)
+        note.author = self.author
+        return note
+
+    def load(self, built):
+        self.prefetch([note for _, note in built if isinstance(note, Note)])
+        batch = []
+        for number, note in built:
+            if isinstance(note, str):
+                self.errors.append((number, note))
+            elif not note.slug:
+                note.slug = self.slugs.allocate(self.base(note))
+                batch.append((number, note, False))
+            elif note.slug in self.slugs.taken:
+                self.errors.append((number, note.slug + WARNING))
+            else:
+                self.slugs.add(note.slug)
+                batch.append((number, note, True))
+        self.flush(batch)
+
+    def base(self, note):
+        return base_slug(note.title, self.max_length)
+
+    def prefetch(self, notes):
+        """
+        Занятые slug, с которыми могут столкнуться заметки пачки.
+
+        Основы прошлых пачек не перечитываются: если такой slug успели
+        занять, вставку повторит save_one.
+        """
+        stems = {
+            slug_stem(self.base(note), self.max_length)
+            for note in notes if not note.slug
+        } - self.stems
+        self.stems |= stems
+        conditions = [starts_with(stem) for stem in sorted(stems)]
+        explicit = [note.slug for note in notes if note.slug]
+        if explicit:
+            conditions.append(Q(slug__in=explicit))
+        for start in range(0, len(conditions), PREFIXES_PER_QUERY):
+            for slug in Note.objects.filter(
+                reduce(or_, conditions[start:start + PREFIXES_PER_QUERY])
+            ).values_list('slug', flat=True):
+                self.slugs.add(slug)
+
+    def flush(self, batch):
+        """
+        Пачка одной вставкой; если slug успели занять, по одной.
+
+        bulk_create в SQLite не возвращает id, поэтому заметки для
+        поискового индекса перечитываются по их уникальным slug.
+        """
+        if not batch:
+            return
+        notes = [note for _, note, _ in batch]
+        try:
+            with transaction.atomic():
+                Note.objects.bulk_create(notes)
+                for note in Note.objects.filter(
+                    slug__in=[note.slug for note in notes]
+                ):
+                    index_note(note)
+            self.created += len(notes)
+        except IntegrityError:
+            for number, note, explicit in batch:
+                self.save_one(number, note, explicit)
+
+    def save_one(self, number, note, explicit):
+        """Выданный в памяти slug модель подберёт заново."""
+        if not explicit:
+            note.slug = ''
+        try:
+            with transaction.atomic():
+                note.save()
+            self.created += 1
+        except IntegrityError:
+            self.errors.append((number, note.slug + WARNING))
+
+
+def author_notes(author, chunk_size=CHUNK_SIZE):
+    """Заметки автора порциями по ключу (author, id)."""
+    last_pk = 0
+    while True:
+        notes = list(
+            Note.objects.filter(author=author, pk__gt=last_pk).order_by(
+                'pk'
+            ).only('id', 'title', 'text', 'slug')[:chunk_size]
+        )
+        if not notes:
+            return
+        yield from notes
+        last_pk = notes[-1].pk
+
+
+def jsonl_chunks(notes):
+    for note in notes:
+        yield (json.dumps(
+            {'title': note.title, 'text': note.text, 'slug': note.slug},
+            ensure_ascii=False,
+        ) + '\n').encode('utf-8')
+
+
+class ZipBuffer:
+    """Поток только на запись: zipfile пишет, ответ забирает частями."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def markdown_zip_chunks(notes):
+    """ZIP собирается на лету: в памяти только текущая заметка."""
+    buffer = ZipBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for note in notes:
+            archive.writestr(
+                note.slug + MARKDOWN_SUFFIX,
+                f'{HEADING}{note.title}\n\n{note.text}',
+            )
+            yield buffer.pop()
+    yield buffer.pop()
+
+
+FORMATS = {
+    'jsonl': (jsonl_chunks, 'application/jsonl'),
+    'zip': (markdown_zip_chunks, 'application/zip'),
+}
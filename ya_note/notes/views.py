@@ -1,9 +1,19 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError, transaction
+from django.http import Http404, StreamingHttpResponse
 from django.urls import reverse_lazy
 from django.views import generic
 
-from .forms import NoteForm
+from .forms import WARNING, NoteForm, NotesImportForm
 from .models import Note
+from .search import search_notes
+from .transfer import (
+    FORMATS, NoteImport, TransferError, author_notes, read_rows
+)
+
+# Больше id не бывает: SQLite не примет такое число в запрос.
+MAX_ID = 2 ** 63 - 1
 
 
 class Home(generic.TemplateView):
@@ -25,6 +35,15 @@ class NoteBase(LoginRequiredMixin):
         """Пользователь может работать только со своими заметками."""
         return self.model.objects.filter(author=self.request.user)
 
+    def form_valid(self, form):
+        """Заданный slug мог успеть занять параллельный запрос."""
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError:
+            form.add_error('slug', form.instance.slug + WARNING)
+            return self.form_invalid(form)
+
 
 class NoteCreate(NoteBase, generic.CreateView):
     """Добавление заметки."""
@@ -32,9 +51,7 @@ class NoteCreate(NoteBase, generic.CreateView):
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
@@ -53,6 +70,84 @@ class NotesList(NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
 
+    def get_queryset(self):
+        """
+        Заметки после курсора `after` в порядке id.
+
+        Индекс (author, id) отдаёт страницу без OFFSET и сортировки,
+        а большой текст заметок для списка не читается.
+        """
+        queryset = super().get_queryset().only(
+            'id', 'slug', 'title'
+        ).order_by('id')
+        after = self.request.GET.get('after')
+        if after:
+            try:
+                after = int(after)
+            except ValueError:
+                raise Http404('Некорректный курсор.')
+            if not 0 <= after <= MAX_ID:
+                raise Http404('Некорректный курсор.')
+            queryset = queryset.filter(id__gt=after)
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        size = settings.NOTES_COUNT_ON_LIST_PAGE
+        notes = list(self.object_list[:size + 1])
+        next_cursor = notes[size - 1].id if len(notes) > size else None
+        context = super().get_context_data(
+            object_list=notes[:size], **kwargs
+        )
+        context['next_cursor'] = next_cursor
+        return context
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_queryset(self):
+        return search_notes(
+            self.request.user,
+            self.request.GET.get('q', ''),
+            settings.NOTES_SEARCH_RESULTS,
+        )
+
+
+class NotesImport(LoginRequiredMixin, generic.FormView):
+    """Загрузка заметок из файла JSON Lines или ZIP с Markdown."""
+    template_name = 'notes/import.html'
+    form_class = NotesImportForm
+
+    def form_valid(self, form):
+        try:
+            result = NoteImport(self.request.user).run(
+                read_rows(form.cleaned_data['file'])
+            )
+        except TransferError as error:
+            form.add_error('file', str(error))
+            return self.form_invalid(form)
+        return self.render_to_response(
+            self.get_context_data(form=form, result=result)
+        )
+
+
+class NotesExport(LoginRequiredMixin, generic.View):
+    """Потоковая выгрузка заметок пользователя."""
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'jsonl')
+        if export_format not in FORMATS:
+            raise Http404('Неизвестный формат выгрузки.')
+        chunks, content_type = FORMATS[export_format]
+        response = StreamingHttpResponse(
+            chunks(author_notes(request.user)), content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="notes.{export_format}"'
+        )
+        return response
+
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
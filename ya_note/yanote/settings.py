@@ -1,8 +1,11 @@
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Общий для обоих проектов пакет yaperf лежит в корне репозитория.
+sys.path.append(str(BASE_DIR.parent))
 
 SECRET_KEY = 'django-insecure-yipnj$#j!ajarq%k55z4kuf3x79)91h0h42o9!1ho(z=!%mt=#'
 
@@ -22,6 +25,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yaperf.middleware.PerformanceMiddleware',
+    'yaperf.middleware.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,8 +59,11 @@ WSGI_APPLICATION = 'yanote.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # WAL и прагмы на каждое соединение: см. yaperf.sqlite.base.
+        'ENGINE': 'yaperf.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение с прагмами переживает запрос, а не открывается заново.
+        'CONN_MAX_AGE': 60,
     }
 }
 
@@ -87,3 +95,16 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_LIST_PAGE = 100
+NOTES_SEARCH_BACKEND = 'auto'
+NOTES_SEARCH_RESULTS = 50
+
+PERF_METRICS_ENABLED = False
+PERF_METRICS_LOG_INTERVAL = 0
+# Токен сборщика метрик в Authorization: Bearer; пусто — только staff.
+PERF_METRICS_TOKEN = ''
+
+NPLUSONE_ENABLED = True
+NPLUSONE_THRESHOLD = 5
+NPLUSONE_RAISE = False
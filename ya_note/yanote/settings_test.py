@@ -0,0 +1,23 @@
+"""Настройки тестов: база и кеш в памяти, дешёвый хешер паролей."""
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'yaperf.sqlite',
+        'NAME': ':memory:',
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Стойкость хеша в тестах не нужна, а PBKDF2 — десятки миллисекунд
+# на каждый create_user и admin_client.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+NPLUSONE_RAISE = True
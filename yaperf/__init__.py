@@ -0,0 +1 @@
+"""Общие для ya_news и ya_note средства замера производительности."""
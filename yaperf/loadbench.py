@@ -0,0 +1,374 @@
+"""
+Нагрузочный замер горячих страниц через тестовый клиент и WSGI-сервер.
+
+Проект наполняет базу и описывает сценарии, здесь — прогон: перцентили
+задержки, запросы к базе на запрос, пик памяти и отчёт в JSON, который
+можно сравнить с прошлым прогоном.
+"""
+import http.client
+import json
+import os
+import platform
+import sqlite3
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import HttpRequest
+from django.middleware.csrf import get_token
+from django.test import Client, override_settings
+
+TRANSPORTS = ('client', 'wsgi')
+REQUESTS = 200
+WARMUP = 20
+# Пик памяти меряется отдельной короткой серией: tracemalloc
+# замедляет запросы в разы и исказил бы задержки.
+MEMORY_REQUESTS = 20
+PERCENTILES = (50, 95, 99)
+
+
+class LoadBenchError(Exception):
+    pass
+
+
+class Scenario:
+    """Запрос к странице от имени user; data(номер) даёт тело POST."""
+
+    def __init__(self, name, path, user=None, data=None):
+        self.name = name
+        self.path = path
+        self.user = user
+        self.data = data
+
+    def body(self, number):
+        return None if self.data is None else self.data(number)
+
+
+class QueryCounter:
+    __slots__ = ('queries',)
+
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def bench_database():
+    """
+    Чистая тестовая база в файле.
+
+    База в памяти видна только своему соединению, а WSGI-сервер
+    работает в другом потоке со своим.
+    """
+    test_settings = connection.settings_dict['TEST']
+    saved = dict(test_settings)
+    # Соединение с базой в памяти Django не закрывает, чтобы не потерять
+    # её, и create_test_db продолжил бы работать с ним. Откладываем его
+    # до конца замера: тестовая база pytest остаётся цела.
+    kept = connection.connection if connection.is_in_memory_db() else None
+    if kept is not None:
+        connection.connection = None
+    with tempfile.TemporaryDirectory() as directory:
+        test_settings['NAME'] = os.path.join(directory, 'loadbench.sqlite3')
+        old_name = connection.creation.create_test_db(
+            verbosity=0, serialize=False
+        )
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings.clear()
+            test_settings.update(saved)
+            if kept is not None:
+                connection.connection = kept
+
+
+class ClientTransport:
+    """django.test.Client в том же потоке, без сети."""
+
+    def __init__(self, user):
+        self.client = Client(SERVER_NAME='localhost')
+        if user is not None:
+            self.client.force_login(user)
+        self.counter = QueryCounter()
+
+    def __call__(self, path, data):
+        with connection.execute_wrapper(self.counter):
+            if data is None:
+                return self.client.get(path).status_code
+            return self.client.post(path, data).status_code
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class WsgiServer:
+    """Приложение Django за wsgiref в отдельном потоке."""
+
+    def __init__(self):
+        self.counter = QueryCounter()
+        handler = WSGIHandler()
+
+        def application(environ, start_response):
+            with connection.execute_wrapper(self.counter):
+                return handler(environ, start_response)
+
+        self.httpd = make_server(
+            '127.0.0.1', 0, application, handler_class=QuietHandler
+        )
+        self.port = self.httpd.server_port
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, daemon=True
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+
+class WsgiTransport:
+    """
+    HTTP-запросы к WsgiServer с сессией user и CSRF-токеном.
+
+    Сессию заводит тестовый клиент, токен — тот же get_token, что
+    и в шаблонах: сервер проверяет CSRF по-настоящему.
+    """
+
+    def __init__(self, server, user):
+        self.server = server
+        self.counter = server.counter
+        cookies = {}
+        if user is not None:
+            client = Client()
+            client.force_login(user)
+            cookies[settings.SESSION_COOKIE_NAME] = client.cookies[
+                settings.SESSION_COOKIE_NAME
+            ].value
+        request = HttpRequest()
+        self.csrf_token = get_token(request)
+        cookies[settings.CSRF_COOKIE_NAME] = request.META['CSRF_COOKIE']
+        self.headers = {'Cookie': '; '.join(
+            f'{name}={value}' for name, value in cookies.items()
+        )}
+
+    def __call__(self, path, data):
+        headers, body = self.headers, None
+        if data is not None:
+            headers = dict(
+                headers,
+                **{
+                    'Content-Type': 'application/x-www-form-urlencoded',
+                    'X-CSRFToken': self.csrf_token,
+                },
+            )
+            body = urlencode(data)
+        http_connection = http.client.HTTPConnection(
+            '127.0.0.1', self.server.port
+        )
+        try:
+            http_connection.request(
+                'GET' if body is None else 'POST', path, body, headers
+            )
+            response = http_connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            http_connection.close()
+
+
+def percentile(ordered, percent):
+    """Перцентиль по ближайшему рангу из отсортированных значений."""
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[rank - 1]
+
+
+def measure(send, scenario, transport, requests, warmup):
+    number = 0
+
+    def call():
+        nonlocal number
+        number += 1
+        status = send(scenario.path, scenario.body(number))
+        if status >= 400:
+            raise LoadBenchError(
+                f'{scenario.name} ({transport}): ответ {status}'
+            )
+
+    for _ in range(warmup):
+        call()
+    queries = send.counter.queries
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    queries = (send.counter.queries - queries) / requests
+    tracemalloc.start()
+    try:
+        for _ in range(MEMORY_REQUESTS):
+            call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    latencies.sort()
+    result = {
+        'scenario': scenario.name,
+        'transport': transport,
+        'requests': requests,
+        'mean_ms': sum(latencies) / requests * 1000,
+    }
+    for percent in PERCENTILES:
+        result[f'p{percent}_ms'] = percentile(latencies, percent) * 1000
+    result['queries_per_request'] = queries
+    result['peak_memory_kib'] = peak / 1024
+    return result
+
+
+def run(scenarios, transports=TRANSPORTS, requests=REQUESTS, warmup=WARMUP):
+    """
+    Прогон сценариев по очереди на каждом транспорте.
+
+    DEBUG выключен, как в продакшене: иначе шаблоны разбираются
+    на каждый запрос, а SQL копится в connection.queries.
+    """
+    unknown = set(transports) - set(TRANSPORTS)
+    if unknown:
+        raise LoadBenchError(f'Неизвестный транспорт: {", ".join(unknown)}')
+    results = []
+    with override_settings(DEBUG=False):
+        cache.clear()
+        if 'client' in transports:
+            for scenario in scenarios:
+                results.append(measure(
+                    ClientTransport(scenario.user), scenario, 'client',
+                    requests, warmup,
+                ))
+        if 'wsgi' in transports:
+            with WsgiServer() as server:
+                for scenario in scenarios:
+                    results.append(measure(
+                        WsgiTransport(server, scenario.user), scenario,
+                        'wsgi', requests, warmup,
+                    ))
+    return results
+
+
+def report(project, volumes, results):
+    """Отчёт для JSON: окружение, объём данных и замеры."""
+    return {
+        'project': project,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'machine': platform.machine(),
+        'volumes': volumes,
+        'results': results,
+    }
+
+
+def write_report(data, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+        file.write('\n')
+
+
+def result_line(result, previous=None):
+    line = (
+        f'{result["scenario"]:<14} {result["transport"]:<6} '
+        f'p50 {result["p50_ms"]:7.2f} p95 {result["p95_ms"]:7.2f} '
+        f'p99 {result["p99_ms"]:7.2f} мс, '
+        f'запросов {result["queries_per_request"]:5.1f}, '
+        f'память {result["peak_memory_kib"]:7.0f} КиБ'
+    )
+    if previous is not None:
+        line += f', p95 {(result["p95_ms"] / previous["p95_ms"] - 1):+.0%}'
+    return line
+
+
+def result_lines(data, previous=None):
+    """Строки отчёта; с previous — изменение p95 к прошлому прогону."""
+    before = {
+        (result['scenario'], result['transport']): result
+        for result in (previous or {}).get('results', ())
+    }
+    for result in data['results']:
+        yield result_line(
+            result, before.get((result['scenario'], result['transport']))
+        )
+
+
+class LoadBenchCommand(BaseCommand):
+    """
+    Основа команды loadbench проекта.
+
+    Подкласс задаёт project, свои аргументы объёма данных
+    и seed(options), который наполняет базу и возвращает объёмы
+    и сценарии.
+    """
+
+    help = 'Нагрузочный замер горячих страниц на чистой тестовой базе.'
+    project = None
+
+    def add_volume_arguments(self, parser):
+        pass
+
+    def seed(self, options):
+        raise NotImplementedError
+
+    def add_arguments(self, parser):
+        self.add_volume_arguments(parser)
+        parser.add_argument('--requests', type=int, default=REQUESTS)
+        parser.add_argument('--warmup', type=int, default=WARMUP)
+        parser.add_argument(
+            '--transport', choices=TRANSPORTS, action='append',
+            dest='transports', help='По умолчанию оба.',
+        )
+        parser.add_argument('--output', help='Файл для отчёта в JSON.')
+        parser.add_argument(
+            '--compare', help='Отчёт прошлого прогона для сравнения p95.'
+        )
+
+    def handle(self, *args, **options):
+        previous = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as file:
+                    previous = json.load(file)
+            except (OSError, ValueError) as error:
+                raise CommandError(f'Не прочитать отчёт: {error}')
+        with bench_database():
+            volumes, scenarios = self.seed(options)
+            try:
+                results = run(
+                    scenarios, options['transports'] or TRANSPORTS,
+                    options['requests'], options['warmup'],
+                )
+            except LoadBenchError as error:
+                raise CommandError(error)
+        data = report(self.project, volumes, results)
+        for line in result_lines(data, previous):
+            self.stdout.write(line)
+        if options['output']:
+            write_report(data, options['output'])
@@ -0,0 +1,148 @@
+import threading
+from bisect import bisect_left
+
+SECONDS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+COUNTS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+BYTES = (1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000)
+
+METRICS = {
+    'request_seconds': SECONDS,
+    'sql_queries': COUNTS,
+    'sql_seconds': SECONDS,
+    'template_seconds': SECONDS,
+    'response_bytes': BYTES,
+}
+
+
+class Histogram:
+    """Число наблюдений по корзинам «не больше границы», как в Prometheus."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+    def quantile(self, q):
+        """Верхняя граница корзины, в которую попадает квантиль q."""
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return float('inf')
+
+
+class Registry:
+    """Гистограммы метрик по имени представления, общие для потоков."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.by_view = {}
+
+    def view_histograms(self, view):
+        """Гистограммы представления в порядке METRICS."""
+        histograms = self.by_view.get(view)
+        if histograms is None:
+            histograms = self.by_view[view] = tuple(
+                self.histograms.setdefault(
+                    (metric, view), Histogram(buckets)
+                )
+                for metric, buckets in METRICS.items()
+            )
+        return histograms
+
+    def observe_request(self, view, *values):
+        """Значения в порядке METRICS; None — метрики нет."""
+        with self.lock:
+            for histogram, value in zip(self.view_histograms(view), values):
+                if value is not None:
+                    histogram.observe(value)
+
+    def observe(self, view, values):
+        self.observe_request(
+            view, *(values.get(metric) for metric in METRICS)
+        )
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+            self.by_view.clear()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                key: (list(histogram.cumulative()), histogram.sum,
+                      histogram.count)
+                for key, histogram in sorted(self.histograms.items())
+                if histogram.count
+            }
+
+    def views(self):
+        with self.lock:
+            return sorted(self.by_view)
+
+    def get(self, metric, view):
+        histogram = self.histograms.get((metric, view))
+        return histogram if histogram and histogram.count else None
+
+
+def label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def prometheus_text(registry, prefix='yaperf'):
+    """Гистограммы в текстовом формате Prometheus."""
+    lines, typed = [], set()
+    for (metric, view), (buckets, total, count) in registry.snapshot().items():
+        name = f'{prefix}_{metric}'
+        if name not in typed:
+            typed.add(name)
+            lines.append(f'# TYPE {name} histogram')
+        view = label(view)
+        for bound, cumulative in buckets:
+            le = '+Inf' if bound == float('inf') else f'{bound:g}'
+            lines.append(
+                f'{name}_bucket{{view="{view}",le="{le}"}} {cumulative}'
+            )
+        lines.append(f'{name}_sum{{view="{view}"}} {total:g}')
+        lines.append(f'{name}_count{{view="{view}"}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def summary_line(registry, view):
+    """Строка журнала: число запросов, p50/p95 времени, SQL и размер."""
+    with registry.lock:
+        requests = registry.get('request_seconds', view)
+        queries = registry.get('sql_queries', view)
+        sql = registry.get('sql_seconds', view)
+        templates = registry.get('template_seconds', view)
+        size = registry.get('response_bytes', view)
+        parts = [
+            f'view={view}',
+            f'requests={requests.count}',
+            f'p50<={requests.quantile(0.5) * 1e3:g}ms',
+            f'p95<={requests.quantile(0.95) * 1e3:g}ms',
+            f'sql_avg={queries.sum / queries.count:.1f}',
+            f'sql_ms_avg={sql.sum / sql.count * 1e3:.2f}',
+            f'template_ms_avg={templates.sum / templates.count * 1e3:.2f}',
+        ]
+        if size is not None:
+            parts.append(f'bytes_avg={size.sum / size.count:.0f}')
+    return ' '.join(parts)
+
+
+registry = Registry()
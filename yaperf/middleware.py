@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import Template
+
+from .metrics import registry, summary_line
+from .nplusone import THRESHOLD, NPlusOneError, QueryShapes
+
+logger = logging.getLogger('yaperf')
+
+UNRESOLVED = '<unresolved>'
+current = ContextVar('yaperf_request', default=None)
+active_wrappers = ContextVar('yaperf_execute_wrappers', default=())
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'sql', 'template', 'rendering', 'elapsed')
+
+    def __init__(self):
+        self.elapsed = 0.0
+        self.queries = 0
+        self.sql = 0.0
+        self.template = 0.0
+        self.rendering = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - started
+            self.queries += 1
+
+
+def dispatch(execute, sql, params, many, context):
+    """
+    Постоянный execute wrapper соединения: вызывает обёртки запроса.
+
+    Обёртки живут в contextvar, а не на соединениях: под ASGI ORM
+    работает в другом потоке со своими соединениями, а контекст
+    переходит туда вместе с sync_to_async.
+    """
+    for wrapper in active_wrappers.get():
+        execute = partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def install(connection, **kwargs):
+    # В начало списка: соединение может открыться внутри
+    # execute_wrapper(), и тот при выходе снял бы с конца dispatch
+    # вместо своей обёртки.
+    if dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, dispatch)
+
+
+def install_all():
+    """Уже открытые соединения; новые получат dispatch по сигналу."""
+    connection_created.connect(install)
+    for connection in connections.all():
+        install(connection)
+
+
+def attach(wrapper):
+    return active_wrappers.set(active_wrappers.get() + (wrapper,))
+
+
+def detach(token):
+    active_wrappers.reset(token)
+
+
+class HybridMiddleware:
+    """
+    Основа middleware, которая работает и в синхронной цепочке,
+    и в асинхронной без переходов между потоками.
+
+    Подкласс задаёт start(request) — состояние запроса, stop(state)
+    после ответа цепочки и finish(request, response, state).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Так Django узнаёт асинхронную middleware, как у MiddlewareMixin.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        install_all()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.acall(request)
+        state = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.stop(state)
+        return self.finish(request, response, state)
+
+    async def acall(self, request):
+        state = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.stop(state)
+        return self.finish(request, response, state)
+
+
+def timed_render(render):
+    """
+    Время шаблонов внутри запроса, включая render_to_string во view.
+
+    Вложенные отрисовки не считаются второй раз.
+    """
+    def wrapper(self, *args, **kwargs):
+        metrics = current.get()
+        if metrics is None or metrics.rendering:
+            return render(self, *args, **kwargs)
+        metrics.rendering = True
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            metrics.template += time.perf_counter() - started
+            metrics.rendering = False
+    wrapper.timed = True
+    return wrapper
+
+
+def instrument_templates():
+    if not getattr(Template.render, 'timed', False):
+        Template.render = timed_render(Template.render)
+
+
+class PerformanceMiddleware(HybridMiddleware):
+    """
+    Метрики каждого запроса по имени URL: время, SQL, шаблоны, размер.
+
+    Включается настройкой PERF_METRICS_ENABLED; иначе Django убирает
+    middleware из цепочки и она ничего не стоит. Гистограммы копятся
+    в процессе и отдаются представлением yaperf.views.metrics, а при
+    PERF_METRICS_LOG_INTERVAL > 0 раз в столько секунд пишутся в журнал.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERF_METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.log_interval = getattr(settings, 'PERF_METRICS_LOG_INTERVAL', 0)
+        self.logged_at = time.monotonic()
+        instrument_templates()
+
+    def start(self, request):
+        metrics = RequestMetrics()
+        return (
+            metrics, current.set(metrics), attach(metrics),
+            time.perf_counter(),
+        )
+
+    def stop(self, state):
+        metrics, current_token, wrappers_token, started = state
+        metrics.elapsed = time.perf_counter() - started
+        detach(wrappers_token)
+        current.reset(current_token)
+
+    def finish(self, request, response, state):
+        metrics = state[0]
+        match = request.resolver_match
+        registry.observe_request(
+            match.view_name if match else UNRESOLVED,
+            metrics.elapsed,
+            metrics.queries,
+            metrics.sql,
+            metrics.template,
+            None if response.streaming else len(response.content),
+        )
+        if self.log_interval:
+            self.log()
+        return response
+
+    def log(self):
+        now = time.monotonic()
+        if now - self.logged_at < self.log_interval:
+            return
+        self.logged_at = now
+        for view in registry.views():
+            logger.info(summary_line(registry, view))
+
+
+class NPlusOneMiddleware(HybridMiddleware):
+    """
+    Повторяющиеся SELECT одной формы за запрос — признак N+1.
+
+    Включается настройкой NPLUSONE_ENABLED; порог — NPLUSONE_THRESHOLD.
+    Найденное пишется в журнал с шаблоном и строкой кода, откуда пришёл
+    запрос, а при NPLUSONE_RAISE (его включают тесты) — поднимается
+    NPlusOneError.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'NPLUSONE_ENABLED', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.threshold = getattr(settings, 'NPLUSONE_THRESHOLD', THRESHOLD)
+
+    def start(self, request):
+        shapes = QueryShapes(self.threshold)
+        return shapes, attach(shapes)
+
+    def stop(self, state):
+        detach(state[1])
+
+    def finish(self, request, response, state):
+        repeated = state[0].repeated()
+        if repeated:
+            self.report(request, repeated)
+        return response
+
+    def report(self, request, repeated):
+        message = f'N+1 в {request.method} {request.path}:\n' + '\n'.join(
+            str(query) for query in repeated
+        )
+        if getattr(settings, 'NPLUSONE_RAISE', False):
+            raise NPlusOneError(message)
+        logger.warning(message)
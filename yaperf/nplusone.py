@@ -0,0 +1,104 @@
+import re
+import sys
+
+from django.conf import settings
+from django.template.base import Node
+
+# Больше стольких SELECT одной формы за запрос — уже N+1.
+THRESHOLD = 5
+
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+NUMBER = re.compile(r'\b\d+\b')
+STRING = re.compile(r"'(?:[^']|'')*'")
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def fingerprint(sql):
+    """Форма запроса: параметры, числа и длина списков IN не важны."""
+    sql = STRING.sub('?', sql)
+    sql = IN_LIST.sub('IN (...)', sql)
+    return NUMBER.sub('N', sql)
+
+
+def template_line(frame):
+    """Строка шаблона самого глубокого узла, который сейчас отрисовывается."""
+    code = Node.render_annotated.__code__
+    while frame is not None:
+        if frame.f_code is code:
+            node = frame.f_locals['self']
+            token = getattr(node, 'token', None)
+            origin = getattr(node, 'origin', None)
+            if token is not None and origin is not None:
+                name = origin.template_name or origin.name
+                return f'{name}:{token.lineno}'
+        frame = frame.f_back
+    return None
+
+
+def code_line(frame):
+    """Ближайшая к запросу строка кода проекта, не из его venv."""
+    base_dir = str(settings.BASE_DIR)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base_dir)
+            and 'site-packages' not in filename
+        ):
+            return f'{filename[len(base_dir) + 1:]}:{frame.f_lineno}'
+        frame = frame.f_back
+    return None
+
+
+class Repeated:
+    __slots__ = ('sql', 'count', 'template', 'code')
+
+    def __init__(self, sql, count, template, code):
+        self.sql = sql
+        self.count = count
+        self.template = template
+        self.code = code
+
+    def __str__(self):
+        where = ', '.join(
+            place for place in (self.template, self.code) if place
+        )
+        return f'{self.count} × {self.sql}' + (
+            f' (из {where})' if where else ''
+        )
+
+
+class QueryShapes:
+    """
+    Execute wrapper: считает SELECT каждой формы.
+
+    Откуда запрос, выясняется по стеку один раз — когда форма
+    впервые превышает порог, — поэтому обычные запросы почти
+    ничего не стоят.
+    """
+
+    __slots__ = ('threshold', 'counts', 'origins')
+
+    def __init__(self, threshold=THRESHOLD):
+        self.threshold = threshold
+        self.counts = {}
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql[:6].upper() == 'SELECT':
+            shape = fingerprint(sql)
+            count = self.counts[shape] = self.counts.get(shape, 0) + 1
+            if count == self.threshold + 1:
+                frame = sys._getframe(1)
+                self.origins[shape] = (
+                    template_line(frame), code_line(frame)
+                )
+        return execute(sql, params, many, context)
+
+    def repeated(self):
+        return [
+            Repeated(shape, self.counts[shape], *origin)
+            for shape, origin in self.origins.items()
+        ]
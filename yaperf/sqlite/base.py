@@ -0,0 +1,54 @@
+"""
+SQLite для продакшена: WAL, прагмы на каждое соединение и BEGIN
+IMMEDIATE для транзакций.
+
+Подключается как ENGINE 'yaperf.sqlite'. В OPTIONS, кроме параметров
+sqlite3.connect, понимает pragmas — словарь, заменяющий PRAGMAS,
+и transaction_mode — DEFERRED, IMMEDIATE или EXCLUSIVE.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = {
+    # Читатели не ждут писателя, а писатель — читателей.
+    'journal_mode': 'WAL',
+    # В режиме WAL не теряет целостность, fsync только на checkpoint.
+    'synchronous': 'NORMAL',
+    # Миллисекунды ожидания блокировки вместо «database is locked».
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — в КиБ: 64 МиБ страниц на соединение.
+    'cache_size': -64 * 1024,
+}
+# Транзакция сразу берёт блокировку записи. С DEFERRED чтение внутри
+# atomic() и последующая запись упираются во встречного писателя,
+# и SQLite отвечает «database is locked», не дожидаясь busy_timeout.
+TRANSACTION_MODE = 'IMMEDIATE'
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+OWN_OPTIONS = ('pragmas', 'transaction_mode')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    transaction_mode = TRANSACTION_MODE
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        for option in OWN_OPTIONS:
+            params.pop(option, None)
+        return params
+
+    def init_connection_state(self):
+        super().init_connection_state()
+        options = self.settings_dict['OPTIONS']
+        mode = options.get('transaction_mode', TRANSACTION_MODE).upper()
+        if mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f'transaction_mode должен быть одним из: '
+                f'{", ".join(TRANSACTION_MODES)}.'
+            )
+        self.transaction_mode = mode
+        for name, value in options.get('pragmas', PRAGMAS).items():
+            self.connection.execute(f'PRAGMA {name} = {value}')
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.cache import never_cache
+
+from .metrics import prometheus_text, registry
+
+BEARER = 'Bearer '
+
+
+def has_scrape_token(request):
+    """Заголовок Authorization: Bearer с токеном PERF_METRICS_TOKEN."""
+    token = getattr(settings, 'PERF_METRICS_TOKEN', '')
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    return bool(token) and header.startswith(BEARER) and (
+        constant_time_compare(header[len(BEARER):], token)
+    )
+
+
+@never_cache
+def metrics(request):
+    """
+    Гистограммы для Prometheus: сотрудникам и сборщику с токеном.
+
+    Адрес клиента не проверяется: за прокси на той же машине
+    все запросы пришли бы с 127.0.0.1.
+    """
+    if not getattr(settings, 'PERF_METRICS_ENABLED', False):
+        raise Http404
+    if not (request.user.is_staff or has_scrape_token(request)):
+        raise Http404
+    return HttpResponse(
+        prometheus_text(registry),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )